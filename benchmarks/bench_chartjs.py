@@ -0,0 +1,95 @@
+"""Benchmark the pivot-based graphs.prepare_chartjs_data against the old per-player loop.
+
+Usage (from the project root):
+    python -m benchmarks.bench_chartjs [--players 50] [--seasons 24]
+
+Both builders are checked to produce identical Chart.js datasets before timing.
+"""
+
+import argparse
+import contextlib
+import io
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.fake_supabase import install_fake_client
+install_fake_client(["webapp.supabase_client"])  # graphs imports the Supabase client, it is never queried here
+from webapp.services.graphs import prepare_chartjs_data
+from webapp.services.process_data import replace_nan
+
+
+def legacy_data_values(grouped_data, y_variable, x_variable="season"):
+    """The per-player loop prepare_chartjs_data used before the pivot, kept as the baseline."""
+    x_labels = sorted(grouped_data[x_variable].unique())
+    player_names = grouped_data["name"].unique()
+    rows = []
+    for player in player_names:
+        player_data = replace_nan(grouped_data[grouped_data["name"]==player])
+        season_value_map = dict(zip(player_data["season"], player_data[y_variable]))
+        data_values = []
+        for season in x_labels:
+            value = season_value_map.get(season,None)
+            if value is None:
+                data_values.append(None)
+            else:
+                try:
+                    data_values.append(float("{:.3g}".format(float(value))))
+                except (ValueError, TypeError):
+                    data_values.append(None)
+        rows.append((player, data_values))
+    return x_labels, rows
+
+
+# Decimal half-way values, where rounding the scaled float and formatting it disagree
+TIE_VALUES = [72.45, 5.395, 80.55, 9.205, 0.1235, 2.675, 1.005, 100.5, 33.35, 0.0625]
+
+
+def make_grouped_data(players, seasons, missing=0.2, seed=0):
+    """Grouped means like fetch_graph_data returns, with some player/season pairs missing and some ties."""
+    rng = np.random.default_rng(seed)
+    season_labels = [f"{2020 + month // 12}-{month % 12 + 1:02d}" for month in range(seasons)]
+    rows = [{"season": season, "name": f"player {p}", "attack_stars": rng.uniform(0, 3) * 10.0 ** rng.integers(-2, 4)}
+            for season in season_labels for p in range(players) if rng.random() > missing]
+    grouped_data = pd.DataFrame(rows).sort_values(["season", "name"])
+    grouped_data.loc[grouped_data.sample(frac=0.05, random_state=seed).index, "attack_stars"] = np.nan
+    tie_rows = grouped_data.sample(n=min(len(grouped_data), 10 * len(TIE_VALUES)), random_state=seed + 1).index
+    grouped_data.loc[tie_rows, "attack_stars"] = np.resize(TIE_VALUES, len(tie_rows))
+    return replace_nan(grouped_data)
+
+
+def best_time(function, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--players", type=int, default=50)
+    parser.add_argument("--seasons", type=int, default=24)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    grouped_data = make_grouped_data(args.players, args.seasons)
+    with contextlib.redirect_stdout(io.StringIO()):
+        chartjs_data = prepare_chartjs_data(grouped_data, "attack_stars")
+    x_labels, legacy_rows = legacy_data_values(grouped_data, "attack_stars")
+    assert chartjs_data["labels"] == list(x_labels), "labels differ"
+    assert [(dataset["label"], dataset["data"]) for dataset in chartjs_data["datasets"]] == legacy_rows, "datasets differ"
+    print(f"Outputs identical for {args.players} players x {args.seasons} seasons ({len(grouped_data)} rows).")
+
+    legacy = best_time(lambda: legacy_data_values(grouped_data, "attack_stars"), args.repeats)
+    pivot = best_time(lambda: prepare_chartjs_data(grouped_data, "attack_stars"), args.repeats)
+    print(f"per-player loop: {legacy * 1000:8.2f} ms")
+    print(f"pivot:           {pivot * 1000:8.2f} ms")
+    print(f"Speed-up: {legacy / pivot:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
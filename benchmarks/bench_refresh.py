@@ -0,0 +1,123 @@
+"""Benchmark a refresh run against the local CoC API stand-in.
+
+Usage (from the project root):
+    python -m benchmarks.bench_refresh [--team-size 15] [--latency-ms 80] [--rate-429 0.02] [--full]
+
+By default only the CoC side of a refresh is exercised: tag discovery (get_war_tags and
+wars_with_clan) and loading every clan war with get_war_stats. With --full the real
+load_battle_tags_supabase and load_warData_supabase run against the in-memory Supabase
+stand-in (benchmarks/fake_supabase.py), or the project in SUPABASE_URL with --real-supabase.
+Reports wall time, CoC requests and Supabase round trips for each stage, and exits with
+an error if a stage goes over its Supabase round-trip budget.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+from benchmarks.coc_standin import synthetic_standin, CocStandIn, load_recording
+
+
+@contextlib.contextmanager
+def stage(name, standin, database, results, verbose):
+    """Time a stage and record the CoC requests and Supabase round trips it made."""
+    standin.reset_counts()
+    if database is not None:
+        database.reset_counts()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(None if verbose else io.StringIO()):
+        yield
+    round_trips = database.round_trips if database is not None else None
+    results.append((name, time.perf_counter() - start, dict(standin.counts), round_trips))
+
+
+def round_trip_budgets(clan_wars):
+    """Maximum Supabase round trips per stage for a season with `clan_wars` wars to load."""
+    return {
+        "load_battle_tags_supabase": 2,             # existing tags + one bulk insert
+        "load_warData_supabase": 4 + clan_wars,     # status index + plan + one upsert per war + rollup refresh + status flush
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark a refresh against the CoC API stand-in")
+    parser.add_argument("--team-size", type=int, default=15)
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--latency-ms", type=float, default=80, help="Latency added to every CoC response")
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--replay", help="Serve a recording made with benchmarks.coc_standin --record")
+    parser.add_argument("--cache", action="store_true", help="Keep the on-disk response cache enabled")
+    parser.add_argument("--workers", type=int, default=4, help="max_workers for load_warData_supabase")
+    parser.add_argument("--full", action="store_true", help="Run the full refresh including Supabase writes")
+    parser.add_argument("--real-supabase", action="store_true", help="Use SUPABASE_URL instead of the in-memory stand-in")
+    parser.add_argument("--supabase-latency-ms", type=float, default=0, help="Latency of the in-memory Supabase")
+    parser.add_argument("--verbose", action="store_true", help="Show the refresh scripts' output")
+    args = parser.parse_args()
+
+    options = dict(latency_ms=args.latency_ms, rate_429=args.rate_429)
+    if args.replay:
+        standin = CocStandIn(*load_recording(args.replay), **options).start()
+    else:
+        standin = synthetic_standin(team_size=args.team_size, rounds=args.rounds, **options).start()
+
+    # The refresh modules read these when imported
+    os.environ["COC_API_BASE_URL"] = standin.base_url
+    os.environ.setdefault("COC_API_KEY", "standin")
+    if not args.cache:
+        os.environ["COC_CACHE_PATH"] = ""
+    database = None
+    if not args.real_supabase:
+        # Must be in place before the refresh modules import the client
+        os.environ["SUPABASE_FAKE_LATENCY_MS"] = str(args.supabase_latency_ms)
+        from benchmarks.fake_supabase import install_fake_client
+        database = install_fake_client(["refresh.supabaseRefresh"])
+    from refresh.COC_client import clan_data
+    import refresh.Find_battletags as Find_battletags
+    import refresh.reading_WarData as reading_WarData
+
+    clan_tag = clan_data["clan_tag"]
+    results = []
+    try:
+        if args.full:
+            with stage("load_battle_tags_supabase", standin, database, results, args.verbose):
+                battle_tags = Find_battletags.load_battle_tags_supabase(clan_tag)
+            with stage("load_warData_supabase", standin, database, results, args.verbose):
+                reading_WarData.load_warData_supabase(max_workers=args.workers)
+        else:
+            with stage("tag discovery", standin, database, results, args.verbose):
+                battle_tag_df, season = Find_battletags.get_war_tags(clan_tag)
+                clan_war_tags, clan_war_states = Find_battletags.wars_with_clan(battle_tag_df)
+            with stage("war stats", standin, database, results, args.verbose):
+                for wartag in clan_war_tags.values():
+                    if wartag != "#0":
+                        reading_WarData.get_war_stats(wartag)
+    finally:
+        standin.stop()
+
+    budgets = round_trip_budgets((battle_tags["wartag"] != "#0").sum()) if args.full else {}
+    over_budget = False
+    print(f"{'stage':<28}{'wall (s)':>10}{'supabase':>10}  coc requests")
+    total_time, total_requests = 0.0, 0
+    for name, seconds, counts, round_trips in results:
+        requests_made = counts.get("leaguegroup", 0) + counts.get("wars", 0)
+        total_time += seconds
+        total_requests += requests_made
+        note = ""
+        if round_trips is not None and name in budgets:
+            over = round_trips > budgets[name]
+            over_budget = over_budget or over
+            note = f"  [budget {budgets[name]}{' EXCEEDED' if over else ''}]"
+        round_trip_text = "-" if round_trips is None else str(round_trips)
+        print(f"{name:<28}{seconds:>10.3f}{round_trip_text:>10}  {requests_made} {counts}{note}")
+    print(f"{'total':<28}{total_time:>10.3f}{'':>10}  {total_requests}")
+    if database is not None and args.verbose:
+        print("Supabase round trips:", dict(database.calls))
+    if over_budget:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
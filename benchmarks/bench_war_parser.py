@@ -0,0 +1,192 @@
+"""Benchmark the columnar war parser against the old per-member `member` class.
+
+Usage (from the project root):
+    python -m benchmarks.bench_war_parser [--team-size 50] [--wars 200]
+
+Both parsers are checked to produce identical WAR_DATA_SCHEMA records before timing.
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic_wars import make_clan, make_war
+from refresh.war_parser import WAR_DATA_SCHEMA, parse_war_members, frame_to_records
+
+debug_print_statements = False
+CLAN_NAME = "Pussay Palace"
+
+
+class member():
+    """The per-member parser that refresh/reading_WarData.py used before war_parser, kept as the baseline."""
+    def __init__(self, member_json):
+        self.tag = member_json["tag"]
+        self.name = member_json["name"]
+        self.townhallLevel = member_json["townhallLevel"]
+        self.mapPosistion = member_json["mapPosition"]
+
+        self.attacker_townhallLevel = np.nan
+        self.defender_townhallLevel = np.nan
+        self.attack_th_diff = np.nan
+        self.defense_th_diff = np.nan
+
+        if "attacks" not in member_json or member_json["attacks"] is None:
+            self.attack_stars = np.nan
+            self.attack_percentage = np.nan
+            self.attack_duration = np.nan
+            self.defender_tag = np.nan
+        else:
+            self.attack_stars = member_json["attacks"][0]["stars"]
+            self.attack_percentage = member_json["attacks"][0]["destructionPercentage"]
+            self.attack_duration = member_json["attacks"][0]["duration"]
+            self.defender_tag = member_json["attacks"][0]["defenderTag"]
+
+        if "bestOpponentAttack" not in member_json or member_json["bestOpponentAttack"] is None:
+            self.defense_stars = np.nan
+            self.defense_percentage = np.nan
+            self.defense_duration = np.nan
+            self.attacker_tag = np.nan
+        else:
+            self.defense_stars = member_json["bestOpponentAttack"]["stars"]
+            self.defense_percentage = member_json["bestOpponentAttack"]["destructionPercentage"]
+            self.defense_duration = member_json["bestOpponentAttack"]["duration"]
+            self.attacker_tag = member_json["bestOpponentAttack"]["attackerTag"]
+
+    def find_attacker_TH_level(self, opponent_member_json):
+        if self.defender_tag != np.nan:
+            for opponent in opponent_member_json["members"]:
+                if opponent["tag"] == self.defender_tag:
+                    self.defender_townhallLevel = opponent["townhallLevel"]
+                    break
+
+        if self.attacker_tag != np.nan:
+            for opponent in opponent_member_json["members"]:
+                if opponent["tag"] == self.attacker_tag:
+                    self.attacker_townhallLevel = opponent["townhallLevel"]
+                    break
+
+        self.attack_th_diff = (self.defender_townhallLevel - self.townhallLevel
+                        if not np.isnan(self.defender_townhallLevel) else np.nan)
+        self.defense_th_diff = (self.attacker_townhallLevel - self.townhallLevel
+                        if not np.isnan(self.attacker_townhallLevel) else np.nan)
+
+    def to_dataframe_row(self):
+        return {
+            'tag': self.tag,
+            'name': self.name,
+            'townhallLevel': self._to_int(self.townhallLevel),
+            'mapPosition': self._to_int(self.mapPosistion),
+            'attacker_townhallLevel': self._to_int(self.attacker_townhallLevel),
+            'defender_townhallLevel': self._to_int(self.defender_townhallLevel),
+            'attack_th_diff': self._to_int(self.attack_th_diff),
+            'defense_th_diff': self._to_int(self.defense_th_diff),
+            'attack_stars': self._to_int(self.attack_stars),
+            'attack_percentage': self._to_int(self.attack_percentage),
+            'attack_duration': self._to_int(self.attack_duration),
+            'defender_tag': self.defender_tag,
+            'defense_stars': self._to_int(self.defense_stars),
+            'defense_percentage': self._to_int(self.defense_percentage),
+            'defense_duration': self._to_int(self.defense_duration),
+            'attacker_tag': self.attacker_tag
+        }
+
+    def _to_int(self, value):
+        if value is None:
+            return None
+        if isinstance(value, float) and np.isnan(value):
+            return None
+        try:
+            return int(value)
+        except Exception:
+            return None
+
+
+def clean_record_for_supabase(record, schema=WAR_DATA_SCHEMA):
+    """Per-record cleaning done by WarDataManager.save_war_data before war_parser."""
+    cleaned = {}
+    for key, dtype in schema.items():
+        val = record.get(key)
+        if dtype is int:
+            try:
+                if val is None:
+                    cleaned[key] = None
+                elif isinstance(val, float) and np.isnan(val):
+                    cleaned[key] = None
+                elif isinstance(val, str) and val.strip().lower() == "nan":
+                    cleaned[key] = None
+                else:
+                    cleaned[key] = int(float(val))
+            except Exception:
+                cleaned[key] = None
+        elif dtype is str:
+            cleaned[key] = None if val is None else str(val).strip()
+        else:
+            cleaned[key] = val
+    return cleaned
+
+
+def legacy_records(war_data):
+    side, other_side = ("clan", "opponent") if war_data["clan"]["name"] == CLAN_NAME else ("opponent", "clan")
+    member_array = []
+    for member_info in war_data[side]["members"]:
+        clan_member = member(member_info)
+        clan_member.find_attacker_TH_level(war_data[other_side])
+        member_array.append(clan_member)
+    war_df = pd.DataFrame([m.to_dataframe_row() for m in member_array])
+    clean_df = war_df.replace([np.inf, -np.inf], None)
+    # Null mapping done per record, newer pandas turn None back into NaN in DataFrame.map
+    records = [{key: None if pd.isnull(value) else value for key, value in record.items()}
+               for record in clean_df.to_dict(orient='records')]
+    return [clean_record_for_supabase(record) for record in records]
+
+
+def columnar_records(war_data):
+    return frame_to_records(parse_war_members(war_data, CLAN_NAME))
+
+
+def make_payloads(team_size, wars, seed=0):
+    rng = random.Random(seed)
+    payloads = []
+    for i in range(wars):
+        clan = make_clan(rng, CLAN_NAME, team_size)
+        opponent = make_clan(rng, f"Opponent {i}", team_size)
+        # Alternate which side the clan is on, like real CWL wars
+        sides = (clan, opponent) if i % 2 == 0 else (opponent, clan)
+        payloads.append(make_war(f"#WAR{i}", *sides, seed=seed + i))
+    return payloads
+
+
+def time_parser(parser, payloads, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for payload in payloads:
+            parser(payload)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--team-size", type=int, default=50)
+    parser.add_argument("--wars", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    payloads = make_payloads(args.team_size, args.wars)
+    for payload in payloads:
+        assert legacy_records(payload) == columnar_records(payload), "parsers disagree"
+    print(f"Outputs identical for {len(payloads)} {args.team_size}v{args.team_size} wars.")
+
+    legacy = time_parser(legacy_records, payloads, args.repeats)
+    columnar = time_parser(columnar_records, payloads, args.repeats)
+    print(f"member class + clean_record_for_supabase: {legacy * 1000 / len(payloads):8.3f} ms/war")
+    print(f"war_parser columnar:                      {columnar * 1000 / len(payloads):8.3f} ms/war")
+    print(f"Speed-up: {legacy / columnar:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
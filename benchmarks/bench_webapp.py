@@ -0,0 +1,80 @@
+"""Benchmark the webapp's pages against the in-memory Supabase stand-in.
+
+Usage (from the project root):
+    python -m benchmarks.bench_webapp [--seasons 3] [--team-size 15] [--latency-ms 40] [--repeat 5]
+
+Seeds benchmarks/fake_supabase.py with synthetic battle_tags, war_status and war_data
+tables, requests each page with the Flask test client and reports the Supabase round trips
+and wall time per request, cold (empty result cache) and warm. Exits with an error if a
+cold page goes over its round-trip budget or a warm page touches Supabase at all.
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import time
+
+from benchmarks.synthetic_wars import make_tables
+
+CLAN_NAME = "Pussay Palace"
+
+# Maximum Supabase round trips for one request to each page with an empty result cache,
+# including the data version check
+ROUND_TRIP_BUDGETS = {
+    "/": 2,
+    "/war-table": 2,
+    "/api/war-table?sort=attack_stars&direction=desc": 2,
+    "/progress-graphs": 3,
+    "/api/graph-data?stat=attack_stars": 2,
+    "/api/graph-data?stat=attack_stars&stat=defense_stars&stat=attack_percentage&x=season&x=battleday": 2,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark webapp pages against the in-memory Supabase")
+    parser.add_argument("--seasons", type=int, default=3)
+    parser.add_argument("--team-size", type=int, default=15)
+    parser.add_argument("--latency-ms", type=float, default=40, help="Latency added to every Supabase round trip")
+    parser.add_argument("--repeat", type=int, default=5, help="Cold and warm requests per page, the median is reported")
+    parser.add_argument("--verbose", action="store_true", help="Show the webapp's output")
+    args = parser.parse_args()
+
+    # Must be in place before the webapp modules import the client
+    from benchmarks.fake_supabase import install_fake_client
+    database = install_fake_client(["webapp.supabase_client"])
+    database.tables.update(make_tables(CLAN_NAME, seasons=args.seasons, team_size=args.team_size))
+    database.latency_ms = args.latency_ms
+
+    from webapp import create_app
+    from webapp.services.cache import result_cache
+    client = create_app().test_client()
+
+    over_budget = False
+    print(f"{'page':<50}{'cache':>6}{'status':>7}{'median (s)':>12}{'supabase':>10}  budget")
+    for path, cold_budget in ROUND_TRIP_BUDGETS.items():
+        for label, budget in (("cold", cold_budget), ("warm", 0)):
+            timings, round_trips = [], []
+            for _ in range(args.repeat):
+                if label == "cold":
+                    result_cache.clear()
+                database.reset_counts()
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(None if args.verbose else io.StringIO()):
+                    response = client.get(path)
+                timings.append(time.perf_counter() - start)
+                round_trips.append(database.round_trips)
+            timings.sort()
+            worst = max(round_trips)
+            over = worst > budget
+            over_budget = over_budget or over
+            print(f"{path:<50}{label:>6}{response.status_code:>7}{timings[len(timings) // 2]:>12.3f}{worst:>10}  "
+                  f"{budget}{' EXCEEDED' if over else ''}")
+            if args.verbose:
+                print("  ", dict(database.calls))
+    if over_budget:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""Local stand-in for the CoC API endpoints used by the refresh scripts.
+
+Serves `/clans/{tag}/currentwar/leaguegroup` and `/clanwarleagues/wars/{tag}` from
+synthetic or recorded payloads, with configurable latency, random 429 responses and a
+maintenance switch (503). Point the refresh client at it with COC_API_BASE_URL.
+
+Usage (from the project root):
+    python -m benchmarks.coc_standin --port 8099 --team-size 30 --latency-ms 50
+    python -m benchmarks.coc_standin --replay recordings/2025-11
+    python -m benchmarks.coc_standin --record recordings/2025-11   # needs COC_API_KEY
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+from benchmarks.synthetic_wars import make_league_group
+
+CLAN_NAME = "Pussay Palace"
+league_group_path = re.compile(r"^/v1/clans/([^/]+)/currentwar/leaguegroup$")
+war_path = re.compile(r"^/v1/clanwarleagues/wars/([^/]+)$")
+
+
+class CocStandIn:
+    def __init__(self, league_group, wars, latency_ms=0, rate_429=0.0, max_age=0, host="127.0.0.1", port=0, seed=0):
+        """
+        Initialize the stand-in server
+
+        Args:
+            league_group: League group payload returned for any clan tag
+            wars: Dict of war tag to war payload
+            latency_ms: Delay added to every response
+            rate_429: Probability of answering a request with 429
+            max_age: Cache-Control max-age sent with successful responses
+            host: Interface to listen on
+            port: Port to listen on, 0 picks a free one
+            seed: Random seed for 429 injection
+        """
+        self.league_group = league_group
+        self.wars = wars
+        self.latency_ms = latency_ms
+        self.rate_429 = rate_429
+        self.max_age = max_age
+        self.maintenance = False
+        self.rng = random.Random(seed)
+        self.counts = Counter()
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _handler_class(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                status, body = standin.respond(self.path)
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                if status == 200 and standin.max_age:
+                    self.send_header("Cache-Control", f"public max-age={standin.max_age}")
+                if status == 429:
+                    self.send_header("Retry-After", "0")
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass # Keep benchmark output readable
+
+        return Handler
+
+    def respond(self, path):
+        """Return (status, body) for a request path and count it."""
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+        if league_group_path.match(path):
+            endpoint, body = "leaguegroup", self.league_group
+        elif war_path.match(path):
+            endpoint, body = "wars", self.wars.get(unquote(war_path.match(path).group(1)))
+        else:
+            endpoint, body = "other", None
+
+        with self.lock:
+            self.counts[endpoint] += 1
+            if self.maintenance:
+                self.counts["503"] += 1
+                return 503, {"reason": "inMaintenance", "message": "Server is down for maintenance."}
+            if self.rate_429 and self.rng.random() < self.rate_429:
+                self.counts["429"] += 1
+                return 429, {"reason": "requestThrottled"}
+        if body is None:
+            return 404, {"reason": "notFound"}
+        return 200, body
+
+    def reset_counts(self):
+        with self.lock:
+            self.counts = Counter()
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def synthetic_standin(team_size=15, rounds=7, clans=8, seed=0, **kwargs):
+    """Stand-in serving a synthetic league group that contains CLAN_NAME."""
+    league_group, wars = make_league_group(CLAN_NAME, team_size=team_size, rounds=rounds, clans=clans, seed=seed)
+    return CocStandIn(league_group, wars, **kwargs)
+
+
+def load_recording(directory):
+    """Load a recording made by record_league_group: leaguegroup.json and wars/*.json."""
+    with open(os.path.join(directory, "leaguegroup.json")) as f:
+        league_group = json.load(f)
+    wars = {}
+    wars_dir = os.path.join(directory, "wars")
+    for filename in os.listdir(wars_dir):
+        with open(os.path.join(wars_dir, filename)) as f:
+            wars["#" + filename[:-len(".json")]] = json.load(f)
+    return league_group, wars
+
+
+def record_league_group(clan_tag, directory, client):
+    """Save the live league group and every war in it for later replay."""
+    os.makedirs(os.path.join(directory, "wars"), exist_ok=True)
+    league_group = client.get_league_group(clan_tag)
+    with open(os.path.join(directory, "leaguegroup.json"), "w") as f:
+        json.dump(league_group, f)
+    for league_round in league_group["rounds"]:
+        for war_tag in league_round["warTags"]:
+            if war_tag == "#0":
+                continue
+            with open(os.path.join(directory, "wars", war_tag[1:] + ".json"), "w") as f:
+                json.dump(client.get_cwl_war(war_tag), f)
+    print(f"Recorded league group {league_group.get('season')} to {directory}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local CoC API stand-in")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--team-size", type=int, default=15)
+    parser.add_argument("--rounds", type=int, default=7, help="Rounds with war tags, the rest are #0")
+    parser.add_argument("--clans", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Probability of a 429 response")
+    parser.add_argument("--max-age", type=int, default=0, help="Cache-Control max-age of responses")
+    parser.add_argument("--maintenance", action="store_true", help="Answer every request with 503")
+    parser.add_argument("--replay", help="Directory recorded with --record to serve instead of synthetic data")
+    parser.add_argument("--record", help="Record the live league group to this directory and exit")
+    args = parser.parse_args()
+
+    if args.record:
+        from refresh.COC_client import CocClient, clan_data
+        record_league_group(clan_data["clan_tag"], args.record, CocClient())
+        return
+
+    options = dict(latency_ms=args.latency_ms, rate_429=args.rate_429, max_age=args.max_age, port=args.port)
+    if args.replay:
+        standin = CocStandIn(*load_recording(args.replay), **options)
+    else:
+        standin = synthetic_standin(args.team_size, args.rounds, args.clans, **options)
+    standin.maintenance = args.maintenance
+    print(f"Serving CoC API stand-in at {standin.base_url} (set COC_API_BASE_URL to this)")
+    try:
+        standin.server.serve_forever()
+    except KeyboardInterrupt:
+        standin.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,479 @@
+"""In-memory stand-in for the Supabase client that counts round trips.
+
+Covers the `table().select().eq().neq().in_().order().limit().range().insert().update()
+.upsert().execute()` chain (plus `not_`, `rpc()` and read-only views) used by refresh/ and webapp/.
+Every execute() is one round trip: it is counted per table and operation and can be
+delayed by a simulated latency.
+
+The benchmark runners swap it in with install_fake_client() before importing the code
+under test; the client modules themselves never load it. Settings:
+- SUPABASE_FAKE_SEED: JSON file of {table: [rows]} to start from, the rollup is built if missing
+- SUPABASE_FAKE_LATENCY_MS: latency added to every round trip
+- SUPABASE_FAKE_MAX_ROWS: rows returned per select at most, like PostgREST's max rows (default 1000)
+"""
+
+import copy
+import importlib
+import json
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+
+
+class FakeResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+    def __iter__(self):
+        # supabase-py responses are pydantic models, which iterate as (field, value) pairs
+        return iter([("data", self.data), ("count", self.count)])
+
+
+class FakeQuery:
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.operation = "select"
+        self.columns = "*"
+        self.count = None
+        self.filters = []
+        self.orders = []
+        self.limit_rows = None
+        self.offset = 0
+        self.payload = None
+        self.on_conflict = None
+        self.negate_next = False
+
+    # Operations
+    def select(self, columns="*", count=None):
+        self.operation, self.columns, self.count = "select", columns or "*", count
+        return self
+
+    def insert(self, rows):
+        self.operation, self.payload = "insert", rows
+        return self
+
+    def upsert(self, rows, on_conflict=None, **kwargs):
+        self.operation, self.payload, self.on_conflict = "upsert", rows, on_conflict
+        return self
+
+    def update(self, values):
+        self.operation, self.payload = "update", values
+        return self
+
+    def delete(self):
+        self.operation = "delete"
+        return self
+
+    # Filters
+    def _filter(self, test):
+        if self.negate_next:
+            self.negate_next = False
+            self.filters.append(lambda row, test=test: not test(row))
+        else:
+            self.filters.append(test)
+        return self
+
+    @property
+    def not_(self):
+        self.negate_next = True
+        return self
+
+    def eq(self, column, value):
+        return self._filter(lambda row: row.get(column) == value)
+
+    def neq(self, column, value):
+        return self._filter(lambda row: row.get(column) != value)
+
+    def gt(self, column, value):
+        return self._filter(lambda row: row.get(column) is not None and row.get(column) > value)
+
+    def gte(self, column, value):
+        return self._filter(lambda row: row.get(column) is not None and row.get(column) >= value)
+
+    def lt(self, column, value):
+        return self._filter(lambda row: row.get(column) is not None and row.get(column) < value)
+
+    def lte(self, column, value):
+        return self._filter(lambda row: row.get(column) is not None and row.get(column) <= value)
+
+    def in_(self, column, values):
+        values = list(values)
+        return self._filter(lambda row: row.get(column) in values)
+
+    def is_(self, column, value):
+        return self._filter(lambda row: row.get(column) is None if value in (None, "null") else row.get(column) == value)
+
+    def or_(self, filters):
+        """PostgREST logic filter such as `a.gt.1,and(a.eq.1,b.gt."x"),a.is.null`."""
+        return self._filter(_parse_logic("or", filters))
+
+    # Modifiers
+    def order(self, column, desc=False, nullsfirst=None, **kwargs):
+        self.orders.append((column, desc, nullsfirst))
+        return self
+
+    def limit(self, size):
+        self.limit_rows = size
+        return self
+
+    def range(self, start, end):
+        self.offset, self.limit_rows = start, end - start + 1
+        return self
+
+    def execute(self):
+        return self.client._execute(self)
+
+
+def _split_top_level(text):
+    """Split a PostgREST logic filter on the commas that are not inside brackets or quotes."""
+    parts, depth, quoted, current = [], 0, False, ""
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if quoted and char == "\\":
+            current += text[i:i + 2]
+            i += 2
+            continue
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and char == ",":
+            parts.append(current)
+            current = ""
+            i += 1
+            continue
+        current += char
+        i += 1
+    parts.append(current)
+    return [part.strip() for part in parts if part.strip()]
+
+
+def _parse_value(text):
+    if text.startswith('"') and text.endswith('"'):
+        return text[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+    return text
+
+
+def _coerce(raw, like):
+    """Convert a filter value from text to the type of the row value it is compared with."""
+    if isinstance(raw, str) and isinstance(like, (int, float)) and not isinstance(like, bool):
+        return float(raw)
+    return raw
+
+
+_COMPARISONS = {
+    "eq": lambda a, b: a == b,
+    "neq": lambda a, b: a != b,
+    "gt": lambda a, b: a > b,
+    "gte": lambda a, b: a >= b,
+    "lt": lambda a, b: a < b,
+    "lte": lambda a, b: a <= b,
+}
+
+
+def _parse_logic(combinator, text):
+    tests = []
+    for part in _split_top_level(text):
+        if part.startswith(("and(", "or(")) and part.endswith(")"):
+            inner_combinator, inner = part.split("(", 1)
+            tests.append(_parse_logic(inner_combinator, inner[:-1]))
+            continue
+        column, operator, raw = part.split(".", 2)
+        value = _parse_value(raw)
+        if operator == "is":
+            tests.append(lambda row, column=column: row.get(column) is None)
+        else:
+            compare = _COMPARISONS[operator]
+            tests.append(lambda row, column=column, compare=compare, value=value: row.get(column) is not None
+                         and compare(row.get(column), _coerce(value, row.get(column))))
+    combine = all if combinator == "and" else any
+    return lambda row: combine(test(row) for test in tests)
+
+
+class FakeRpc:
+    def __init__(self, client, name, params):
+        self.client = client
+        self.name = name
+        self.params = params or {}
+
+    def execute(self):
+        return self.client._execute_rpc(self)
+
+
+class FakeSupabase:
+    def __init__(self, tables=None, latency_ms=0, max_rows=None):
+        """
+        Initialize the fake client
+
+        Args:
+            tables: Dict of table name to list of row dicts to start from
+            latency_ms: Latency added to every round trip
+            max_rows: Cap on the rows a select returns, None for no cap
+        """
+        self.tables = defaultdict(list, copy.deepcopy(tables or {}))
+        self.latency_ms = latency_ms
+        self.max_rows = max_rows
+        self.rpcs = {}
+        self.views = {}
+        self.calls = Counter()  # (table or rpc name, operation) -> round trips
+        self.next_id = Counter({name: max((row.get("id") or 0 for row in rows), default=0)
+                                for name, rows in self.tables.items()})
+        self.lock = threading.Lock()
+
+    @property
+    def round_trips(self):
+        return sum(self.calls.values())
+
+    def reset_counts(self):
+        with self.lock:
+            self.calls = Counter()
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    def rpc(self, name, params=None):
+        return FakeRpc(self, name, params)
+
+    def register_rpc(self, name, function):
+        """Register a Python function taking (tables, params) that mimics a database function."""
+        self.rpcs[name] = function
+
+    def register_view(self, name, function):
+        """Register a Python function taking tables and returning the rows of a database view."""
+        self.views[name] = function
+
+    def _simulate_round_trip(self, key):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        with self.lock:
+            self.calls[key] += 1
+
+    def _execute_rpc(self, rpc):
+        self._simulate_round_trip((rpc.name, "rpc"))
+        if rpc.name not in self.rpcs:
+            raise ValueError(f"Fake Supabase has no rpc '{rpc.name}'")
+        with self.lock:
+            return FakeResponse(copy.deepcopy(self.rpcs[rpc.name](self.tables, rpc.params)))
+
+    def _execute(self, query):
+        self._simulate_round_trip((query.table, query.operation))
+        with self.lock:
+            if query.table in self.views:
+                if query.operation != "select":
+                    raise ValueError(f"Fake Supabase view '{query.table}' is read only")
+                rows = self.views[query.table](self.tables)
+                return self._select(query, [row for row in rows if all(test(row) for test in query.filters)])
+            rows = self.tables[query.table]
+            if query.operation == "insert":
+                new_rows = [self._with_id(query.table, row) for row in self._as_list(query.payload)]
+                rows.extend(new_rows)
+                return FakeResponse(copy.deepcopy(new_rows))
+            if query.operation == "upsert":
+                return FakeResponse(copy.deepcopy(self._upsert(query)))
+            matching = [row for row in rows if all(test(row) for test in query.filters)]
+            if query.operation == "update":
+                for row in matching:
+                    row.update(copy.deepcopy(query.payload))
+                return FakeResponse(copy.deepcopy(matching))
+            if query.operation == "delete":
+                self.tables[query.table] = [row for row in rows if not any(row is match for match in matching)]
+                return FakeResponse(copy.deepcopy(matching))
+            return self._select(query, matching)
+
+    def _select(self, query, rows):
+        # Apply orders last to first so the first order is the primary sort key
+        for column, desc, nullsfirst in reversed(query.orders):
+            nulls_first = desc if nullsfirst is None else nullsfirst # Postgres puts nulls first when descending
+            present = sorted((row for row in rows if row.get(column) is not None), key=lambda row: row[column], reverse=desc)
+            missing = [row for row in rows if row.get(column) is None]
+            rows = missing + present if nulls_first else present + missing
+        count = len(rows) if query.count else None
+        limit = query.limit_rows
+        if self.max_rows is not None:
+            limit = self.max_rows if limit is None else min(limit, self.max_rows)
+        end = None if limit is None else query.offset + limit
+        rows = rows[query.offset:end]
+        if query.columns.strip() != "*":
+            columns = [column.strip() for column in query.columns.split(",")]
+            rows = [{column: row.get(column) for column in columns} for row in rows]
+        return FakeResponse(copy.deepcopy(rows), count)
+
+    def _upsert(self, query):
+        keys = [key.strip() for key in (query.on_conflict or "id").split(",")]
+        rows = self.tables[query.table]
+        index = {tuple(row.get(key) for key in keys): row for row in rows}
+        saved = []
+        for new_row in self._as_list(query.payload):
+            existing = index.get(tuple(new_row.get(key) for key in keys))
+            if existing is not None:
+                existing.update(copy.deepcopy(new_row))
+                saved.append(existing)
+            else:
+                row = self._with_id(query.table, new_row)
+                rows.append(row)
+                index[tuple(row.get(key) for key in keys)] = row
+                saved.append(row)
+        return saved
+
+    def _with_id(self, table, row):
+        row = copy.deepcopy(row)
+        if "id" not in row:
+            self.next_id[table] += 1
+            row["id"] = self.next_id[table]
+        return row
+
+    @staticmethod
+    def _as_list(payload):
+        return payload if isinstance(payload, list) else [payload]
+
+
+# Python mirrors of the database functions in sql/, registered on the shared client
+
+INDEX_STAT_COLUMNS = ["attack_th_diff", "defense_th_diff", "attack_stars", "attack_percentage", "defense_stars", "defense_percentage"]
+
+
+# Stats summed and counted per (tag, season) by player_season_stats (sql/004_player_season_stats.sql)
+ROLLUP_STAT_COLUMNS = ["townhallLevel", "mapPosition", "attacker_townhallLevel", "defender_townhallLevel",
+                       "attack_th_diff", "defense_th_diff", "attack_stars", "attack_percentage", "attack_duration",
+                       "defense_stars", "defense_percentage", "defense_duration"]
+
+
+def _ratio(total, count):
+    return round(total / count, 2) if count else None
+
+
+def _player_averages(tables, params):
+    """Mirror of player_averages, reading the rollup (sql/004_player_season_stats.sql)."""
+    player_name = params.get("player_name")
+    rows = [row for row in tables["player_season_stats"] if player_name is None or row.get("name") == player_name]
+    seasons = [row["season"] for row in tables["player_season_stats"] if row.get("season") is not None]
+    recent_season = max(seasons) if seasons else None
+
+    results = []
+    for scope, season in (("all_time", None), ("recent", recent_season)):
+        by_player = defaultdict(list)
+        for row in rows:
+            if scope == "all_time" or row.get("season") == season:
+                by_player[row.get("name")].append(row)
+        for name, player_rows in by_player.items():
+            result = {"scope": scope, "season": season, "name": name}
+            result.update({column: _ratio(sum(row[f"{column}_sum"] for row in player_rows),
+                                          sum(row[f"{column}_count"] for row in player_rows))
+                           for column in INDEX_STAT_COLUMNS})
+            results.append(result)
+    return results
+
+
+def _refresh_player_season_stats(tables, params):
+    """Mirror of refresh_player_season_stats (sql/004_player_season_stats.sql)."""
+    affected = set(zip(params.get("tags") or [], params.get("seasons") or []))
+    by_key = defaultdict(list)
+    for row in tables["war_data"]:
+        key = (row.get("tag"), row.get("season"))
+        if key in affected:
+            by_key[key].append(row)
+
+    rollup = [row for row in tables["player_season_stats"] if (row["tag"], row["season"]) not in affected]
+    now = time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime())
+    for (tag, season), war_rows in by_key.items():
+        latest = max(war_rows, key=lambda row: (row.get("battleday") is not None, row.get("battleday") or 0))
+        row = {"tag": tag, "season": season, "name": latest.get("name"), "wars": len(war_rows), "updated_at": now}
+        for column in ROLLUP_STAT_COLUMNS:
+            values = [war_row.get(column) for war_row in war_rows if war_row.get(column) is not None]
+            row[f"{column}_sum"], row[f"{column}_count"] = sum(values), len(values)
+        rollup.append(row)
+    tables["player_season_stats"] = rollup
+    return len(by_key)
+
+
+def rebuild_player_season_stats(tables):
+    """Build the rollup for every (tag, season) in war_data, like the backfill at the end of sql/004."""
+    keys = sorted({(row["tag"], row["season"]) for row in tables.get("war_data", [])
+                   if row.get("tag") is not None and row.get("season") is not None})
+    tables.setdefault("player_season_stats", [])
+    _refresh_player_season_stats(tables, {"tags": [tag for tag, _ in keys], "seasons": [season for _, season in keys]})
+    return tables
+
+
+def _filter_options(tables, params):
+    """Mirror of filter_options (sql/003_filter_options.sql)."""
+    players = sorted({row["name"] for row in tables["war_data"] if row.get("name") is not None})
+    seasons = sorted({row["season"] for row in tables["war_data"] if row.get("season") is not None})
+    return ([{"kind": "player", "value": name} for name in players]
+            + [{"kind": "season", "value": season} for season in seasons])
+
+
+def _wars_to_load(tables):
+    """Mirror of the wars_to_load view (sql/005_wars_to_load.sql)."""
+    loading_status = {row.get("wartag"): row.get("loading_status") for row in tables["war_status"]}
+    return [{"wartag": row.get("wartag"), "season": row.get("season"), "battleday": row.get("battleday")}
+            for row in tables["battle_tags"]
+            if row.get("wartag") != "#0" and loading_status.get(row.get("wartag")) not in ("completed", "Error - too old")]
+
+
+PROJECT_VIEWS = {
+    "wars_to_load": _wars_to_load,
+}
+
+
+PROJECT_RPCS = {
+    "player_averages": _player_averages,
+    "filter_options": _filter_options,
+    "refresh_player_season_stats": _refresh_player_season_stats,
+}
+
+
+_shared_client = None
+
+
+def get_fake_client():
+    """Return the process-wide fake client, so refresh and webapp code share one database."""
+    global _shared_client
+    if _shared_client is None:
+        tables = {}
+        seed_path = os.getenv("SUPABASE_FAKE_SEED")
+        if seed_path:
+            with open(seed_path) as f:
+                tables = json.load(f)
+            if "war_data" in tables and "player_season_stats" not in tables:
+                rebuild_player_season_stats(tables)  # Seeds saved before the rollup existed
+        _shared_client = FakeSupabase(tables, latency_ms=float(os.getenv("SUPABASE_FAKE_LATENCY_MS", 0)),
+                                      max_rows=int(os.getenv("SUPABASE_FAKE_MAX_ROWS", 1000)))
+        for name, function in PROJECT_RPCS.items():
+            _shared_client.register_rpc(name, function)
+        for name, function in PROJECT_VIEWS.items():
+            _shared_client.register_view(name, function)
+    return _shared_client
+
+
+CLIENT_MODULES = ["refresh.supabaseRefresh", "webapp.supabase_client"]
+
+
+def install_fake_client(modules=CLIENT_MODULES):
+    """
+    Replace the `supabase` client of the given client modules with the shared fake
+
+    Must run before importing anything that does `from <client module> import supabase`,
+    as those names are bound on import.
+
+    Args:
+        modules: Names of the client modules to patch
+
+    Returns:
+        FakeSupabase: The shared fake client
+    """
+    # Placeholders so the real clients can be built on import, they are replaced before any request
+    os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+    os.environ.setdefault("SUPABASE_KEY", "fake-key")
+    os.environ.setdefault("SUPABASE_SERVICE_KEY", "fake-key")
+    fake = get_fake_client()
+    for name in modules:
+        importlib.import_module(name).supabase = fake
+    print(f"Using the in-memory Supabase stand-in for {', '.join(modules)}.")
+    return fake
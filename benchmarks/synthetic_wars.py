@@ -0,0 +1,170 @@
+"""Synthetic CoC API payloads for offline benchmarks.
+
+Payloads follow the shape of the `/clanwarleagues/wars/{tag}` and
+`/clans/{tag}/currentwar/leaguegroup` responses closely enough for the refresh scripts.
+"""
+
+import random
+from datetime import datetime, timedelta, timezone
+
+TAG_CHARS = "0289PYLQGRJCUV"
+
+
+def make_tag(rng, length=9):
+    return "#" + "".join(rng.choice(TAG_CHARS) for _ in range(length))
+
+
+def coc_time(dt):
+    """Format a datetime the way the CoC API does, e.g. 20251104T083000.000Z"""
+    return dt.strftime("%Y%m%dT%H%M%S.000Z")
+
+
+def make_clan(rng, name, team_size):
+    members = []
+    for position in range(1, team_size + 1):
+        members.append({
+            "tag": make_tag(rng),
+            "name": f"{name} member {position}",
+            "townhallLevel": rng.randint(10, 17),
+            "mapPosition": position,
+        })
+    return {"tag": make_tag(rng), "name": name, "clanLevel": rng.randint(10, 30), "members": members}
+
+
+def add_attacks(rng, clan, opponent, attack_rate=0.9):
+    """Give members of `clan` attacks on `opponent` and fill in opponent's bestOpponentAttack."""
+    for member in clan["members"]:
+        if rng.random() > attack_rate:
+            continue
+        defender = rng.choice(opponent["members"])
+        attack = {
+            "attackerTag": member["tag"],
+            "defenderTag": defender["tag"],
+            "stars": rng.randint(0, 3),
+            "destructionPercentage": rng.randint(20, 100),
+            "order": 1,
+            "duration": rng.randint(30, 180),
+        }
+        member["attacks"] = [attack]
+        best = defender.get("bestOpponentAttack")
+        if best is None or (attack["stars"], attack["destructionPercentage"]) > (best["stars"], best["destructionPercentage"]):
+            defender["bestOpponentAttack"] = attack
+
+
+def make_war(war_tag, clan, opponent, state="warEnded", start=None, seed=None):
+    """Build a CWL war payload between two clans made by make_clan.
+
+    Args:
+        war_tag (str): Tag of the war
+        clan (dict): Clan on the "clan" side, its member lists are copied
+        opponent (dict): Clan on the "opponent" side
+        state (str): CoC war state
+        start (datetime): Battle day start time, defaults to a day ago
+        seed: Random seed for the attacks
+
+    Returns:
+        dict: War payload
+    """
+    rng = random.Random(seed if seed is not None else war_tag)
+    clan = {**clan, "members": [dict(member) for member in clan["members"]]}
+    opponent = {**opponent, "members": [dict(member) for member in opponent["members"]]}
+    if state in ("inWar", "warEnded"):
+        add_attacks(rng, clan, opponent)
+        add_attacks(rng, opponent, clan)
+    start = start or datetime.now(timezone.utc) - timedelta(days=1)
+    return {
+        "state": state,
+        "teamSize": len(clan["members"]),
+        "preparationStartTime": coc_time(start - timedelta(days=1)),
+        "startTime": coc_time(start),
+        "endTime": coc_time(start + timedelta(days=1)),
+        "warStartTime": coc_time(start),
+        "clan": clan,
+        "opponent": opponent,
+    }
+
+
+def make_league_group(clan_name, season="2025-11", team_size=15, rounds=7, clans=8, seed=0, now=None):
+    """Build a league group and all of its wars.
+
+    Rounds whose preparation hasn't started yet get "#0" war tags, like the real API.
+
+    Args:
+        clan_name (str): Name of the tracked clan, it is always one of the clans
+        season (str): Season identifier
+        team_size (int): Members per side
+        rounds (int): Number of rounds with war tags
+        clans (int): Clans in the group, paired into clans // 2 wars per round
+        seed: Random seed
+        now (datetime): Current time, rounds are laid out a day apart ending before it
+
+    Returns:
+        tuple: (league_group, wars) where wars maps war tag to war payload
+    """
+    rng = random.Random(seed)
+    now = now or datetime.now(timezone.utc)
+    group_clans = [make_clan(rng, clan_name if i == 0 else f"Clan {i}", team_size) for i in range(clans)]
+    wars = {}
+    league_rounds = []
+    for round_index in range(7):
+        if round_index >= rounds:
+            league_rounds.append({"warTags": ["#0"] * (clans // 2)})
+            continue
+        start = now - timedelta(days=rounds - round_index - 1)
+        state = "warEnded" if start + timedelta(days=1) <= now else "inWar"
+        order = group_clans[:]
+        rng.shuffle(order)
+        war_tags = []
+        for pair in range(clans // 2):
+            war_tag = make_tag(rng, 10)
+            wars[war_tag] = make_war(war_tag, order[2 * pair], order[2 * pair + 1], state=state, start=start,
+                                     seed=f"{seed}-{war_tag}")
+            war_tags.append(war_tag)
+        league_rounds.append({"warTags": war_tags})
+
+    league_group = {
+        "state": "inWar" if rounds < 7 else "ended",
+        "season": season,
+        "clans": [{"tag": clan["tag"], "name": clan["name"], "clanLevel": clan["clanLevel"]} for clan in group_clans],
+        "rounds": league_rounds,
+    }
+    return league_group, wars
+
+
+def make_tables(clan_name, seasons=3, team_size=15, seed=0):
+    """Build Supabase tables (battle_tags, war_status, war_data, player_season_stats) for several finished seasons.
+
+    Args:
+        clan_name (str): Name of the tracked clan
+        seasons (int): Number of seasons, ending with 2025-11
+        team_size (int): Members per side, the clan keeps the same roster every season
+        seed: Random seed
+
+    Returns:
+        dict: Table name to list of row dicts, as taken by FakeSupabase
+    """
+    from refresh.war_parser import parse_war_members, frame_to_records
+    from benchmarks.fake_supabase import rebuild_player_season_stats
+
+    tables = {"battle_tags": [], "war_status": [], "war_data": []}
+    for index in range(seasons):
+        year, month = divmod(2025 * 12 + 10 - (seasons - 1 - index), 12)
+        season = f"{year}-{month + 1:02d}"
+        league_group, wars = make_league_group(clan_name, season=season, team_size=team_size, seed=f"{seed}-{index}")
+        for battleday, league_round in enumerate(league_group["rounds"], start=1):
+            for war_tag in league_round["warTags"]:
+                war = wars[war_tag]
+                if clan_name not in (war["clan"]["name"], war["opponent"]["name"]):
+                    continue
+                # Fresh tags per season so wars don't collide across seasons
+                war_tag = f"{war_tag}{index}"
+                war_df = parse_war_members(war, clan_name)
+                war_df["season"], war_df["battleday"], war_df["wartag"] = season, battleday, war_tag
+                # Keep the same player tags every season, names are already stable
+                war_df["tag"] = "#P" + war_df["name"].str.rsplit(" ", n=1).str[-1]
+                tables["war_data"].extend(frame_to_records(war_df))
+                tables["battle_tags"].append({"battleday": battleday, "wartag": war_tag, "season": season})
+                tables["war_status"].append({"wartag": war_tag, "coc_war_status": "warEnded", "loading_status": "completed",
+                                             "season": season, "battleday": battleday,
+                                             "last_updated": f"{season}-08T00:00:00+00:00"})
+    return rebuild_player_season_stats(tables)
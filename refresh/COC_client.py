@@ -1,15 +1,23 @@
 """Clash of Clans API client module.
-WIP, currently COC API calls are made directly in refresh scripts.
 
-API calls for accesing the CWL tags are different to actually accessing the clan data,
-so future steps are to have seperate functions in here that the refresh scripts can call.
+All CoC API calls made by the refresh scripts go through `CocClient`, which owns a
+keep-alive session, a token-bucket rate limiter, retries with jittered backoff and a
+circuit breaker for maintenance windows. Successful responses are kept in an on-disk
+cache for as long as the API's Cache-Control allows. Use the shared `coc_client` instance.
 """
 
 from dotenv import load_dotenv
 import os
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from refresh.coc_cache import ResponseCache, DEFAULT_CACHE_PATH, parse_max_age
 
 load_dotenv(os.path.join(os.path.dirname(__file__), '.env.refresh'))
 coc_api_key = os.getenv("COC_API_KEY") # COC API key (loaded from .env.refresh)
+coc_cache_path = os.getenv("COC_CACHE_PATH", DEFAULT_CACHE_PATH) # Set to an empty string to disable the response cache
 
 # Response codes from the API
 response_codes = {
@@ -26,7 +34,7 @@ response_codes = {
 # Pussay Clan Tag
 clan_tag = "%23CQGY2LQU"
 clan_name = "Pussay Palace"
-base_url = "https://api.clashofclans.com/v1"
+base_url = os.getenv("COC_API_BASE_URL", "https://api.clashofclans.com/v1") # Override to point at a local stand-in
 url = base_url + f"/clans/{clan_tag}"
 headers = {
     "Accept": "application/json",
@@ -41,6 +49,218 @@ clan_data = {
     "headers": headers,
 }
 
+# Status codes worth retrying, everything else is returned to the caller straight away
+retry_status_codes = {429, 500, 503}
+
+
+class CocApiError(ValueError):
+    """Raised when a CoC API request fails. Subclasses ValueError so existing handlers still catch it."""
+    def __init__(self, status_code, message=None):
+        self.status_code = status_code
+        message = message or response_codes.get(status_code, "Unknown error")
+        super().__init__(f"API request failed with status code {status_code}: {message}")
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        """
+        Thread-safe token bucket rate limiter
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum number of tokens (burst size)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+                self.last_refill = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class CocClient:
+    def __init__(self, api_key=coc_api_key, base_url=base_url, rate=10, burst=10, max_retries=4,
+                 backoff_base=0.5, backoff_max=30, breaker_threshold=3, breaker_cooldown=300, timeout=10, cache=None):
+        """
+        Initialize the CoC API client
+
+        Args:
+            api_key: CoC API key used for the bearer token
+            base_url: Base url of the CoC API
+            rate: Requests per second allowed by the rate limiter
+            burst: Number of requests that can be made back to back
+            max_retries: Retries for 429/500/503 responses and connection errors
+            backoff_base: Base delay in seconds for the exponential backoff
+            backoff_max: Maximum delay in seconds between retries
+            breaker_threshold: Consecutive 5xx/connection failures before the circuit opens
+            breaker_cooldown: Seconds the circuit stays open before a trial request is allowed
+            timeout: Request timeout in seconds
+            cache: ResponseCache to serve fresh responses from, None to always hit the API
+        """
+        self.base_url = base_url
+        self.cache = cache
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.timeout = timeout
+        self.rate_limiter = TokenBucket(rate, burst)
+
+        # Keep-alive session, pool sized so concurrent callers can reuse connections
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Accept": "application/json",
+            "authorization": "Bearer %s" % api_key,
+        })
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        # Circuit breaker state
+        self.breaker_lock = threading.Lock()
+        self.consecutive_failures = 0
+        self.circuit_open_until = 0.0
+
+    def _backoff_delay(self, attempt, response=None):
+        """Full-jitter exponential backoff, honouring Retry-After when the API sends it."""
+        if response is not None and response.headers.get("Retry-After"):
+            try:
+                return min(self.backoff_max, float(response.headers["Retry-After"]))
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _check_circuit(self):
+        with self.breaker_lock:
+            if time.monotonic() < self.circuit_open_until:
+                raise CocApiError(503, "Circuit open, CoC API is down for maintenance. Skipping request.")
+
+    def _record_result(self, success):
+        with self.breaker_lock:
+            if success:
+                self.consecutive_failures = 0
+                return
+            self.consecutive_failures += 1
+            if self.consecutive_failures >= self.breaker_threshold:
+                print(f"CoC API circuit open for {self.breaker_cooldown}s after {self.consecutive_failures} failures.")
+                self.circuit_open_until = time.monotonic() + self.breaker_cooldown
+
+    def get(self, path, use_cache=True):
+        """
+        GET a CoC API path and return the decoded JSON
+
+        Args:
+            path: Path relative to base_url, e.g. "/clans/%23TAG"
+            use_cache: Serve a fresh cached response if there is one. With False the API is
+                always asked, and its response still replaces the cached one.
+
+        Returns:
+            dict: JSON response
+
+        Raises:
+            CocApiError: If the request fails after retries or the circuit is open
+        """
+        url = self.base_url + path
+        if self.cache is not None and use_cache:
+            cached = self.cache.get(url)
+            if cached is not None:
+                return cached
+
+        for attempt in range(self.max_retries + 1):
+            self._check_circuit()
+            self.rate_limiter.acquire()
+            try:
+                response = self.session.get(url, timeout=self.timeout)
+            except requests.RequestException as e:
+                self._record_result(False)
+                if attempt == self.max_retries:
+                    raise CocApiError(None, f"Connection error: {e}") from e
+                time.sleep(self._backoff_delay(attempt))
+                continue
+
+            if response.status_code == 200:
+                self._record_result(True)
+                data = response.json()
+                if self.cache is not None:
+                    self.cache.set(url, data, parse_max_age(response.headers))
+                return data
+
+            if response.status_code not in retry_status_codes:
+                # Client errors are not the API's fault, don't count them towards the breaker
+                raise CocApiError(response.status_code)
+
+            if response.status_code != 429: # Rate limiting is handled by backoff, not the breaker
+                self._record_result(False)
+            if attempt == self.max_retries:
+                raise CocApiError(response.status_code)
+            delay = self._backoff_delay(attempt, response)
+            print(f"CoC API returned {response.status_code}, retrying in {delay:.1f}s ({attempt + 1}/{self.max_retries})")
+            time.sleep(delay)
+
+    def get_league_group(self, clan_tag):
+        """Get the current CWL league group for a clan."""
+        return self.get(f"/clans/{encode_tag(clan_tag)}/currentwar/leaguegroup")
+
+    def get_cwl_war(self, war_tag, use_cache=True):
+        """Get a single CWL war by its war tag, use_cache=False to skip the response cache."""
+        return self.get(f"/clanwarleagues/wars/{encode_tag(war_tag)}", use_cache)
+
+    def close(self):
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
+
+
+class WarPayloadStore:
+    def __init__(self):
+        """
+        In-run store of CWL war payloads, so wars downloaded during tag discovery
+        can be handed to the war data ingestion without fetching them again.
+        """
+        self.payloads = {}
+        self.lock = threading.Lock()
+
+    def put(self, war_tag, war_data):
+        with self.lock:
+            self.payloads[war_tag] = war_data
+
+    def get(self, war_tag):
+        """Return the payload for a war tag without removing it, or None if it was not stored."""
+        with self.lock:
+            return self.payloads.get(war_tag)
+
+    def take(self, war_tag):
+        """Remove and return the payload for a war tag, or None if it was not stored."""
+        with self.lock:
+            return self.payloads.pop(war_tag, None)
+
+    def __len__(self):
+        return len(self.payloads)
+
+
+def encode_tag(tag):
+    """URL encode a CoC tag, accepting both "#TAG" and already encoded "%23TAG" forms."""
+    return "%23" + tag[1:] if tag.startswith("#") else tag
+
+
+# Shared client used by the refresh scripts
+coc_client = CocClient(cache=ResponseCache(coc_cache_path) if coc_cache_path else None)
+# Shared store of war payloads for the current refresh run
+war_payloads = WarPayloadStore()
+
 
 if __name__ == "__main__":
     print("COC_client module loaded.")
@@ -1,9 +1,9 @@
 import pandas as pd
 import numpy as np
-import requests
 import os
-from refresh.supabaseRefresh import supabase,store_battle_tag # Import supabase client to load .env variables
-from refresh.COC_client import clan_data,response_codes
+from concurrent.futures import ThreadPoolExecutor
+from refresh.supabaseRefresh import supabase,store_battle_tags # Import supabase client to load .env variables
+from refresh.COC_client import clan_data,coc_client,war_payloads
 
 # Pussay Clan Tag
 clan_tag = clan_data["clan_tag"]
@@ -13,6 +13,7 @@ url = clan_data["url"]
 headers = clan_data["headers"]
 
 debug_print_statements = False
+max_round_workers = 7 # One worker per CWL round
 # Make the request to the API
 # response = requests.request("GET", url, headers=headers)
 # data = response.json()
@@ -31,27 +32,20 @@ debug_print_statements = False
 # data_warlog = response_warlog.json()
 # print("War log keys: ", data_warlog["items"][0].keys()) # Keys: ['result', 'endTime', 'teamSize', 'attacksPerMember', 'battleModifier', 'clan', 'opponent']
 
-def get_war_tags(clan_tag, headers = headers):
+def get_war_tags(clan_tag, client=coc_client):
     """Get the war tags for the current war league of the clan.
 
     Args:
         clan_tag (str): The clan tag of the clan to get the war league information for.
-        headers (dict): The headers to use for the API request.
+        client (CocClient): The CoC API client to make the request with.
     Returns:
         dict: The current war league information for the clan.
+
+    Raises:
+        CocApiError: If the league group could not be loaded.
     """
     # Accessing CWL information
-    leaguegroup_url = f"{base_url}/clans/{clan_tag}/currentwar/leaguegroup"
-    leaguegroup_response = requests.get(leaguegroup_url, headers=headers)
-    print("League group response status code:", leaguegroup_response.status_code)
-
-    # Check for errors in the response and print
-    if leaguegroup_response.status_code != 200:
-        print("Error: ", response_codes[leaguegroup_response.status_code])
-        exit()
-
-    # Get the JSON data from the response
-    leaguegroup_data = leaguegroup_response.json()  # Keys: ['state', 'season', 'clans', 'rounds'])
+    leaguegroup_data = client.get_league_group(clan_tag)  # Keys: ['state', 'season', 'clans', 'rounds'])
     season = leaguegroup_data["season"]
 
     # Create a DataFrame to store battle tags in
@@ -132,29 +126,24 @@ def append_days_to_dataframe(existing_data, new_df, season):
 # Then save new data to csv file for each war with the relevant clan tag
 
 
-def Pussay_in_war(battle_tag):
+def Pussay_in_war(battle_tag, client=coc_client, payload_store=war_payloads):
     """Check if the clan is in the war.
 
     Args:
         battleday_tags (string): battle tag for the war
+        client (CocClient): The CoC API client to make the request with.
+        payload_store (WarPayloadStore): Store to hand the clan's war payloads on to the war data ingestion, None to discard them
 
     Returns:
         bool: True if the clan is in the war, False otherwise
     """
-    war_link = f"https://api.clashofclans.com/v1/clanwarleagues/wars/%23{battle_tag[1:]}"
-    # war_response = requests.get(f"{base_url}/clans/{clan_tag}/currentwar", headers=headers)
-    war_response = requests.get(war_link, headers=headers)
-
-    # Print response code and meaning
-    if war_response.status_code != 200:
-        print("Error: ", response_codes[war_response.status_code])
-        exit()
-
-    war_data = war_response.json() # Keys ['state', 'teamSize', 'preparationStartTime', 'startTime', 'endTime', 'clan', 'opponent', 'warStartTime']
+    war_data = client.get_cwl_war(battle_tag) # Keys ['state', 'teamSize', 'preparationStartTime', 'startTime', 'endTime', 'clan', 'opponent', 'warStartTime']
     # "clan" and "opponent" are dictionaries containing the fighting clan's data, these have keys:
     # ['tag', 'name', 'badgeUrls', 'clanLevel', 'attacks', 'stars', 'destructionPercentage', 'members']
     state = war_data["state"]
     if war_data["clan"]["name"] == clan_name or war_data["opponent"]["name"] == clan_name:
+        if payload_store is not None:
+            payload_store.put(battle_tag, war_data)
         if debug_print_statements:
             print(f"Clan is in war {battle_tag}")   
             print("Clan name: ", war_data["clan"]["name"])
@@ -166,11 +155,35 @@ def Pussay_in_war(battle_tag):
             print(f"Clan is not in war {battle_tag}")  
         return False, state
     
-def wars_with_clan(battle_tags):
+def find_clan_war_in_round(row, client=coc_client):
+    """Find the war containing the clan for a single CWL round.
+
+    Args:
+        row (namedtuple): row of the battle tag DataFrame with battleday, season and wartag1-4
+        client (CocClient): The CoC API client to make the requests with.
+
+    Returns:
+        tuple: (battleday, wartag, war_state), wartag is "#0" and war_state is np.nan if the clan is not found
+    """
+    # Find which wartag has Pussay in the war for that day
+    for wartag in [row.wartag1, row.wartag2, row.wartag3, row.wartag4]:
+        if wartag != "#0": # Skip empty tags
+            in_war,war_state = Pussay_in_war(wartag, client)
+            if in_war:
+                print(f"Pussay is in war {wartag} on day {row.battleday} of season {row.season}")
+                return row.battleday, wartag, war_state # Stop at the first war containing the clan
+    return row.battleday, "#0", np.nan
+
+def wars_with_clan(battle_tags, concurrent=True, max_workers=max_round_workers, client=coc_client, known_tags=None):
     """Check which wars in the list contain the clan.
 
     Args:
         battle_tags (list): list of battle tags to check
+        concurrent (bool): resolve all rounds in parallel, defaults to True
+        max_workers (int): maximum number of rounds resolved at the same time
+        client (CocClient): The CoC API client to make the requests with.
+        known_tags (dict): (season, battleday) -> clan war tag of rounds resolved before. Those rounds
+            are taken as they are, with a war state of np.nan, and cost no requests.
 
     Returns:
         dict: dictionary with the war day as the key and the battle tag as the value, or "#0" if the clan is not in the war
@@ -179,19 +192,26 @@ def wars_with_clan(battle_tags):
     clan_war_tags = {1: "#0", 2: "#0", 3: "#0", 4: "#0", 5: "#0", 6: "#0", 7: "#0"}
     clan_war_states = {1: np.nan, 2: np.nan, 3: np.nan, 4: np.nan, 5: np.nan, 6: np.nan, 7: np.nan}
 
-    # Loop through the rows of the DataFrame
-    for row in battle_tags.itertuples():        
-        # Find which wartag has Pussay in the war for that day
-        for wartag in [row.wartag1, row.wartag2, row.wartag3, row.wartag4]:
-            if wartag != "#0": # Skip empty tags
-                in_war,war_state = Pussay_in_war(wartag)
-                if in_war:
-                    print(f"Pussay is in war {wartag} on day {row.battleday} of season {row.season}")
-                    clan_war_tags[row.battleday] = wartag
-                    clan_war_states[row.battleday] = war_state
-                    break # Exit the loop if we found the clan in the war
+    rows = []
+    for row in battle_tags.itertuples():
+        known_tag = (known_tags or {}).get((row.season, int(row.battleday)))
+        if known_tag in (row.wartag1, row.wartag2, row.wartag3, row.wartag4) and known_tag != "#0":
+            clan_war_tags[row.battleday] = known_tag
+        else:
+            rows.append(row)
+
+    if concurrent and len(rows) > 1:
+        # Each round is resolved by its own worker, wars within a round are still checked in order
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(lambda row: find_clan_war_in_round(row, client), rows))
+    else:
+        results = [find_clan_war_in_round(row, client) for row in rows]
+
+    for row, (battleday, wartag, war_state) in zip(rows, results):
+        clan_war_tags[battleday] = wartag
+        clan_war_states[battleday] = war_state
         # Create error messages
-        if clan_war_tags[row.battleday] == "#0":
+        if wartag == "#0":
             print(f"Error: Clan not found in any war on day {row.battleday} of season {row.season}")
 
     return clan_war_tags, clan_war_states
@@ -208,18 +228,26 @@ def Update_Supabase_battle_tags(reduced_warTag_df):
         if col not in reduced_warTag_df.columns:
             raise ValueError(f"Error: Missing required column '{col}' in the DataFrame.")
     
-    for row in reduced_warTag_df.itertuples():
-        if row.wartag != "#0": # Skip empty tags
-            # Check if the battle tag already exists in the database for the same day or season
-            existing_tags = supabase.table("battle_tags").select("*").eq("wartag", row.wartag).eq("season", row.season).eq("battleday", row.battleday).execute()
-            
-            if existing_tags.data:
-                print(f"Battle tag {row.wartag} already exists in the database. Skipping insertion.")
-            else:
-                print(f"Storing battle tag {row.wartag} for day {row.battleday} of season {row.season} to supabase")
-                response = store_battle_tag(row.battleday, row.wartag, row.season)
-                if response:
-                    print(f"Successfully stored battle tag {row.wartag} in the database.")
+    # Load the existing battle tags for the season(s) once and diff in memory
+    new_tags = reduced_warTag_df[reduced_warTag_df["wartag"] != "#0"] # Skip empty tags
+    if new_tags.empty:
+        return
+    seasons = [str(season) for season in new_tags["season"].unique()]
+    existing_tags = supabase.table("battle_tags").select("battleday,wartag,season").in_("season", seasons).execute().data
+    existing_keys = {(int(row["battleday"]), row["wartag"], row["season"]) for row in existing_tags}
+
+    missing_rows = []
+    for row in new_tags.itertuples():
+        if (int(row.battleday), row.wartag, row.season) in existing_keys:
+            print(f"Battle tag {row.wartag} already exists in the database. Skipping insertion.")
+        else:
+            print(f"Storing battle tag {row.wartag} for day {row.battleday} of season {row.season} to supabase")
+            missing_rows.append({"battleday": int(row.battleday), "wartag": row.wartag, "season": row.season})
+
+    if missing_rows:
+        response = store_battle_tags(missing_rows)
+        if response:
+            print(f"Successfully stored {len(response)} battle tag(s) in the database.")
 
 def save_csv_battle_tags(existing_pussay_data, reduced_warTag_df, season):
     # # Save the reduced battle tag DataFrame to a CSV file
@@ -237,11 +265,17 @@ def save_csv_battle_tags(existing_pussay_data, reduced_warTag_df, season):
     new_pussay_data.to_csv(save_filepath, index=False)
     
 
-def load_battle_tags_supabase(clan_tag, headers= headers):
+def load_battle_tags_supabase(clan_tag, client=coc_client, known_tags=None):
     """Load existing battle tags from the Supabase battle_tags table.
 
     Args:
         clan_tag (str): The clan tag of the clan to get the battle tags for.
+        client (CocClient): The CoC API client to make the requests with.
+        known_tags (dict): (season, battleday) -> clan war tag of rounds already resolved, only
+            the other rounds' wars are requested
+
+    Returns:
+        pd.DataFrame: The clan's war tags for the season, columns: battleday, wartag, season
     """
 
     if __name__ == "__main__":
@@ -249,11 +283,11 @@ def load_battle_tags_supabase(clan_tag, headers= headers):
     else:
         prints = False
     # Get the battle tags for the current war league
-    seasonal_battle_tag_df, season = get_war_tags(clan_tag, headers)
+    seasonal_battle_tag_df, season = get_war_tags(clan_tag, client)
     if prints: print("seasonal battle tag df: ", seasonal_battle_tag_df)
 
     # Find which wars the clan is in
-    clan_war_tags,clan_war_states = wars_with_clan(seasonal_battle_tag_df)    
+    clan_war_tags,clan_war_states = wars_with_clan(seasonal_battle_tag_df, client=client, known_tags=known_tags)
     if prints: print("Clan war tags for the week:", clan_war_tags)
 
     # Create a reduced DataFrame with only the war tags containing the clan, columns: battleday, wartag, season
@@ -263,7 +297,8 @@ def load_battle_tags_supabase(clan_tag, headers= headers):
     
     # Save to Supabase battle_tags table
     Update_Supabase_battle_tags(reduced_warTag_df)
+    return reduced_warTag_df
 
 
 if __name__ == "__main__":
-    load_battle_tags_supabase(clan_tag, headers)
\ No newline at end of file
+    load_battle_tags_supabase(clan_tag)
\ No newline at end of file
@@ -0,0 +1,129 @@
+"""Persistent response cache for the CoC API client.
+
+Responses are stored in a small SQLite file keyed by URL and kept for as long as the
+API's `Cache-Control: max-age` allows, so reruns inside the cache window make no
+network calls. The cache is size bounded and evicts the least recently used entries.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(__file__), ".coc_cache.sqlite")
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024 # 50 MB, a full CWL season is roughly 1 MB
+
+max_age_pattern = re.compile(r"max-age=(\d+)")
+
+
+def parse_max_age(headers):
+    """
+    Get the number of seconds a response can be cached for
+
+    Args:
+        headers: Response headers (case-insensitive mapping)
+
+    Returns:
+        int: Seconds the response is fresh for, 0 if it must not be cached
+    """
+    cache_control = headers.get("Cache-Control", "")
+    if "no-store" in cache_control or "no-cache" in cache_control:
+        return 0
+    match = max_age_pattern.search(cache_control)
+    if not match:
+        return 0
+    # Age is how long the response has already spent in upstream caches
+    try:
+        age = int(headers.get("Age", 0))
+    except ValueError:
+        age = 0
+    return max(0, int(match.group(1)) - age)
+
+
+class ResponseCache:
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Initialize the response cache
+
+        Args:
+            path: SQLite file to store responses in
+            max_bytes: Maximum total size of stored bodies before LRU eviction
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "url TEXT PRIMARY KEY, body TEXT NOT NULL, expires_at REAL NOT NULL, "
+            "last_access REAL NOT NULL, size INTEGER NOT NULL)"
+        )
+        self.conn.commit()
+
+    def get(self, url):
+        """
+        Get a fresh cached response
+
+        Args:
+            url: Request URL
+
+        Returns:
+            dict or None: Decoded JSON body if cached and not expired, None otherwise
+        """
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute("SELECT body, expires_at FROM responses WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return None
+            body, expires_at = row
+            if expires_at <= now:
+                self.conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+                self.conn.commit()
+                return None
+            self.conn.execute("UPDATE responses SET last_access = ? WHERE url = ?", (now, url))
+            self.conn.commit()
+        return json.loads(body)
+
+    def set(self, url, data, max_age):
+        """
+        Store a response for max_age seconds, then evict least recently used entries if over size
+
+        Args:
+            url: Request URL
+            data: Decoded JSON body
+            max_age: Seconds the response is fresh for
+        """
+        if max_age <= 0:
+            return
+        body = json.dumps(data)
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (url, body, expires_at, last_access, size) VALUES (?, ?, ?, ?, ?)",
+                (url, body, now + max_age, now, len(body)),
+            )
+            self._evict(now)
+            self.conn.commit()
+
+    def _evict(self, now):
+        """Drop expired entries, then the least recently used ones until under max_bytes."""
+        self.conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for url, size in self.conn.execute("SELECT url, size FROM responses ORDER BY last_access").fetchall():
+            self.conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        with self.lock:
+            self.conn.execute("DELETE FROM responses")
+            self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
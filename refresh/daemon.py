@@ -0,0 +1,178 @@
+"""War-state-aware refresh daemon.
+
+Instead of re-running tag discovery and re-checking every war on a fixed cron schedule,
+the daemon reads each war's preparationStartTime/startTime/endTime and schedules the
+next poll for every war on its own:
+- preparation: first poll when the battle day starts
+- inWar: every `poll_interval` seconds, with a final poll at endTime
+- warEnded: saved once, never polled again
+Between polls it sleeps without making any API calls.
+"""
+
+import heapq
+import time
+from datetime import datetime, timezone
+from refresh.COC_client import CocApiError, coc_client, war_payloads
+from refresh.Find_battletags import load_battle_tags_supabase
+from refresh.reading_WarData import WarDataManager, parse_war_stats
+
+default_poll_interval = 30 * 60     # Seconds between polls of a war in progress
+default_idle_interval = 6 * 60 * 60 # Seconds between league group checks outside CWL
+min_retry_delay = 60                # Seconds before re-polling a war whose state is late to change
+
+
+def parse_coc_time(value):
+    """Parse a CoC API timestamp such as 20251104T083000.000Z into a UTC datetime."""
+    return datetime.strptime(value, "%Y%m%dT%H%M%S.%fZ").replace(tzinfo=timezone.utc)
+
+
+def next_poll_time(war_data, now, poll_interval=default_poll_interval):
+    """
+    Work out when a war should next be polled from its state and timings
+
+    Args:
+        war_data: War payload from the /clanwarleagues/wars endpoint
+        now: Current time as a UTC datetime
+        poll_interval: Seconds between polls while the war is in progress
+
+    Returns:
+        datetime or None: Time of the next poll, always after now, None if the war needs no more polls
+    """
+    state = war_data.get("state")
+    if state == "preparation":
+        next_time = parse_coc_time(war_data["startTime"])
+    elif state == "inWar":
+        # Poll regularly during the battle day, and once more as soon as it has ended
+        end_time = parse_coc_time(war_data["endTime"])
+        next_time = min(datetime.fromtimestamp(now.timestamp() + poll_interval, timezone.utc), end_time)
+    else:
+        return None
+    # The state can lag the start or end time (clock skew, a stale payload), retry shortly
+    # rather than scheduling at or before now, which run_once would pop again straight away
+    retry_time = datetime.fromtimestamp(now.timestamp() + max(1, min(poll_interval, min_retry_delay)), timezone.utc)
+    return max(next_time, retry_time) if next_time <= now else next_time
+
+
+class RefreshDaemon:
+    def __init__(self, clan_tag, client=coc_client, poll_interval=default_poll_interval,
+                 idle_interval=default_idle_interval):
+        """
+        Initialize the refresh daemon
+
+        Args:
+            clan_tag: Clan tag to track
+            client: CoC API client
+            poll_interval: Seconds between polls of a war in progress
+            idle_interval: Seconds between league group checks when no CWL round is pending
+        """
+        self.clan_tag = clan_tag
+        self.client = client
+        self.poll_interval = poll_interval
+        self.idle_interval = idle_interval
+        self.war_manager = WarDataManager(status_table="war_status")
+        self.schedule = []  # heap of (poll time, wartag, season, battleday)
+        self.scheduled_tags = set()
+        self.known_tags = {}        # (season, battleday) -> clan war tag, rounds discovery doesn't resolve again
+        self.start_times = {}       # wartag -> battle day start time, from the payload it was discovered with
+        self.next_discovery = datetime.now(timezone.utc)
+
+    def discover(self, now):
+        """Find the clan's wars for the season, schedule new ones and decide when to look again."""
+        try:
+            reduced_warTag_df = load_battle_tags_supabase(self.clan_tag, self.client, known_tags=self.known_tags)
+        except CocApiError as e:
+            print(f"League group not available ({e}). Checking again in {self.idle_interval / 3600:.1f}h.")
+            self.next_discovery = datetime.fromtimestamp(now.timestamp() + self.idle_interval, timezone.utc)
+            return
+
+        start_times = []
+        for row in reduced_warTag_df.itertuples():
+            if row.wartag == "#0":
+                continue
+            self.known_tags[(row.season, int(row.battleday))] = row.wartag
+            war_data = war_payloads.get(row.wartag)
+            if war_data is not None and "startTime" in war_data:
+                self.start_times[row.wartag] = parse_coc_time(war_data["startTime"])
+            if row.wartag in self.start_times:
+                start_times.append(self.start_times[row.wartag])
+            status = self.war_manager.get_war_status(row.wartag)
+            if row.wartag in self.scheduled_tags or (status and status.get("loading_status") in ["completed", "Error - too old"]):
+                # Already tracked or finished, don't let a later poll pick up this payload once it is stale
+                war_payloads.take(row.wartag)
+                continue
+            # Poll straight away, the discovery payload is reused so this costs no request
+            heapq.heappush(self.schedule, (now, row.wartag, row.season, int(row.battleday)))
+            self.scheduled_tags.add(row.wartag)
+
+        if (reduced_warTag_df["wartag"] == "#0").any() and start_times:
+            # The next round's war tags appear once the latest known round's battle day starts
+            retry_time = datetime.fromtimestamp(now.timestamp() + self.poll_interval, timezone.utc)
+            self.next_discovery = max(max(start_times), retry_time)
+        else:
+            self.next_discovery = datetime.fromtimestamp(now.timestamp() + self.idle_interval, timezone.utc)
+        print(f"Next league group check at {self.next_discovery:%Y-%m-%d %H:%M} UTC.")
+
+    def poll(self, wartag, season, battleday, now):
+        """Load a war, save it and reschedule it if it still needs polling."""
+        try:
+            # Skip the response cache, a payload cached before endTime would still say inWar
+            war_data = war_payloads.take(wartag) or self.client.get_cwl_war(wartag, use_cache=False)
+            self.war_manager.process_war(wartag, lambda tag: parse_war_stats(war_data), season=season, battleday=battleday)
+        except ValueError as e:
+            print(f"✗ Could not load war {wartag}: {e}")
+            # Try again after a normal poll interval
+            heapq.heappush(self.schedule, (datetime.fromtimestamp(now.timestamp() + self.poll_interval, timezone.utc),
+                                           wartag, season, battleday))
+            return
+
+        next_time = next_poll_time(war_data, now, self.poll_interval)
+        if next_time is None:
+            self.scheduled_tags.discard(wartag)
+            print(f"War {wartag} is {war_data.get('state')}, no more polls.")
+        else:
+            heapq.heappush(self.schedule, (next_time, wartag, season, battleday))
+            print(f"War {wartag} is {war_data.get('state')}, next poll at {next_time:%Y-%m-%d %H:%M} UTC.")
+
+    def run_once(self, now=None):
+        """
+        Run everything that is due, then return the number of seconds until something is due again
+        """
+        now = now or datetime.now(timezone.utc)
+        retry_time = datetime.fromtimestamp(now.timestamp() + self.poll_interval, timezone.utc)
+        if now >= self.next_discovery:
+            try:
+                self.discover(now)
+            except Exception as e:
+                # e.g. a Supabase timeout while storing battle tags, wars already scheduled still get polled
+                print(f"❌ League group check failed ({e}). Retrying at {retry_time:%Y-%m-%d %H:%M} UTC.")
+                self.next_discovery = retry_time
+        while self.schedule and self.schedule[0][0] <= now:
+            _, wartag, season, battleday = heapq.heappop(self.schedule)
+            try:
+                self.poll(wartag, season, battleday, now)
+            except Exception as e:
+                print(f"✗ Poll of war {wartag} failed ({e}). Retrying at {retry_time:%Y-%m-%d %H:%M} UTC.")
+                heapq.heappush(self.schedule, (retry_time, wartag, season, battleday))
+        try:
+            self.war_manager.flush_status()
+        except Exception as e:
+            # The updates stay pending in the war manager and go out with the next flush
+            print(f"❌ {e}")
+
+        next_due = self.next_discovery
+        if self.schedule:
+            next_due = min(next_due, self.schedule[0][0])
+        return max(0.0, (next_due - datetime.now(timezone.utc)).total_seconds())
+
+    def run(self):
+        """Run until interrupted, sleeping between polls."""
+        self.war_manager.load_status_index()
+        try:
+            while True:
+                sleep_seconds = self.run_once()
+                print(f"Sleeping for {sleep_seconds / 60:.1f} minutes.")
+                time.sleep(sleep_seconds)
+        except KeyboardInterrupt:
+            print("Refresh daemon stopped.")
+        finally:
+            self.war_manager.flush_status()
@@ -1,12 +1,14 @@
 import pandas as pd
-import numpy as np
-import requests
 import sys
 import io
 import os
-from datetime import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from refresh.supabaseRefresh import supabase
-from refresh.COC_client import clan_data, response_codes
+from supabase_paging import fetch_all_rows
+from refresh.COC_client import clan_data, coc_client, war_payloads
+from refresh.war_parser import parse_war_members, frame_to_records
 
 # Force UTF-8 encoding for stdout
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
@@ -19,181 +21,37 @@ url = clan_data["url"]
 headers = clan_data["headers"]
 
 debug_print_statements = False
+max_war_workers = 4 # Wars ingested in parallel by load_warData_supabase
 
-WAR_DATA_SCHEMA = {
-    'tag': str,
-    'name': str,
-    'townhallLevel': int,
-    'mapPosition': int,
-    'attacker_townhallLevel': int,
-    'defender_townhallLevel': int,
-    'attack_th_diff': int,
-    'defense_th_diff': int,
-    'attack_stars': int,
-    'attack_percentage': int,
-    'attack_duration': int,
-    'defender_tag': str,
-    'defense_stars': int,
-    'defense_percentage': int,
-    'defense_duration': int,
-    'attacker_tag': str,
-    'season': str,
-    'battleday': int,
-    'wartag': str
-}
-class member():
-    def __init__(self, member_json):
-        self.tag = member_json["tag"]
-        self.name = member_json["name"]
-        self.townhallLevel = member_json["townhallLevel"]
-        self.mapPosistion = member_json["mapPosition"]
-
-        self.attacker_townhallLevel = np.nan    #TH level of the opponent that is attacking us
-        self.defender_townhallLevel = np.nan    #TH level of the opponent we attacked
-        self.attack_th_diff = np.nan    # TH diff compared to the opponent we attacked
-        self.defense_th_diff = np.nan   # TH diff compared to the opponent that attacked us
-        
-        if "attacks" not in member_json or member_json["attacks"] is None:
-            self.attack_stars = np.nan
-            self.attack_percentage = np.nan
-            self.attack_duration = np.nan
-            self.defender_tag = np.nan  # Tag of person we attack
-            if debug_print_statements: print(f"Member '{member_json['name']}' has not attacked.")
-
-        else:
-            self.attack_stars = member_json["attacks"][0]["stars"]
-            self.attack_percentage = member_json["attacks"][0]["destructionPercentage"]
-            self.attack_duration = member_json["attacks"][0]["duration"]
-            self.defender_tag = member_json["attacks"][0]["defenderTag"]    # Tag of person we attack
-
-        if "bestOpponentAttack" not in member_json or member_json["bestOpponentAttack"] is None:
-            self.defense_stars = np.nan
-            self.defense_percentage = np.nan
-            self.defense_duration = np.nan
-            self.attacker_tag = np.nan  # Opponent that attacks our clan
-            if debug_print_statements: print(f"Member '{member_json['name']}' has not been attacked.")
-
-        else:
-            self.defense_stars = member_json["bestOpponentAttack"]["stars"]
-            self.defense_percentage = member_json["bestOpponentAttack"]["destructionPercentage"]
-            self.defense_duration = member_json["bestOpponentAttack"]["duration"]
-            self.attacker_tag = member_json["bestOpponentAttack"]["attackerTag"]     # Opponent that attacks our clan
-
-    def __repr__(self):
-        if not np.isnan(self.attack_stars):
-            th_diff = self.attack_th_diff if not np.isnan(self.defender_townhallLevel) else "?"
-            th_info = f" (TH{th_diff:+d})" if th_diff != "?" else ""
-            attack_info = f"{self.attack_stars}★ ({self.attack_percentage}%) vs {self.defender_tag}{th_info}"
-        else:
-            attack_info = "No attack"
-        
-        if not np.isnan(self.defense_stars):
-            th_diff = self.defense_th_diff if not np.isnan(self.attacker_townhallLevel) else "?"
-            th_info = f" (TH{th_diff:+d})" if th_diff != "?" else ""
-            defense_info = f"{self.defense_stars}★ ({self.defense_percentage}%) from {self.attacker_tag}{th_info}"
-        else:
-            defense_info = "Not attacked"
-        
-        return (f"Member({self.name}, tag={self.tag}, TH{self.townhallLevel}, pos={self.mapPosistion})\n"
-                f"  Attack: {attack_info}\n"
-                f"  Defense: {defense_info}")
-
-    def find_attacker_TH_level(self, opponent_member_json):
-        # self.attacker_tag
-        # Opponent_tags = opponent_member_json["attackerTag"]
-
-        # Find the TH level of the person we attacked
-        if self.defender_tag != np.nan:
-            for opponent in opponent_member_json["members"]:
-                if opponent["tag"] == self.defender_tag:
-                    self.defender_townhallLevel = opponent["townhallLevel"]
-                    break
-
-        # Find the TH level of the person that attacked us
-        if self.attacker_tag != np.nan:
-            for opponent in opponent_member_json["members"]:
-                if opponent["tag"] == self.attacker_tag:
-                    self.attacker_townhallLevel = opponent["townhallLevel"]
-                    break
-
-        self.attack_th_diff = (self.defender_townhallLevel - self.townhallLevel 
-                        if not np.isnan(self.defender_townhallLevel) else np.nan)
-        self.defense_th_diff = (self.attacker_townhallLevel - self.townhallLevel 
-                        if not np.isnan(self.attacker_townhallLevel) else np.nan)
-
-        if debug_print_statements: print(f"attacker TH level {self.attacker_townhallLevel}, defender TH level {self.defender_townhallLevel}")
-
-    def to_dataframe_row(self):
-        """Returns a dictionary of all member attributes suitable for adding to a DataFrame."""
-        # Calculate TH differences
-        # attack_th_diff = (self.defender_townhallLevel - self.townhallLevel 
-        #                 if not np.isnan(self.defender_townhallLevel) else np.nan)
-        # defense_th_diff = (self.attacker_townhallLevel - self.townhallLevel 
-        #                 if not np.isnan(self.attacker_townhallLevel) else np.nan)
-        
-        return {
-            'tag': self.tag,
-            'name': self.name,
-            'townhallLevel': self._to_int(self.townhallLevel),
-            'mapPosition': self._to_int(self.mapPosistion),
-            'attacker_townhallLevel': self._to_int(self.attacker_townhallLevel),
-            'defender_townhallLevel': self._to_int(self.defender_townhallLevel),
-            'attack_th_diff': self._to_int(self.attack_th_diff),  # Positive means attacked higher TH
-            'defense_th_diff': self._to_int(self.defense_th_diff),  # Positive means defended against higher TH
-            'attack_stars': self._to_int(self.attack_stars),
-            'attack_percentage': self._to_int(self.attack_percentage),
-            'attack_duration': self._to_int(self.attack_duration),
-            'defender_tag': self.defender_tag,
-            'defense_stars': self._to_int(self.defense_stars),
-            'defense_percentage': self._to_int(self.defense_percentage),
-            'defense_duration': self._to_int(self.defense_duration),
-            'attacker_tag': self.attacker_tag
-        }
-    def _to_int(self, value):
-        import numpy as np
-
-        # Handle None and "nan" (string)
-        if value is None:
-            return None
-        if isinstance(value, float) and np.isnan(value):
-            return None
-        if isinstance(value, str):
-            val_strip = value.strip("'\"").strip().lower()
-            if val_strip == "nan":
-                return None
-            try:
-                return int(float(val_strip))
-            except Exception:
-                print(f"Warning: Could not convert string value '{value}' to int.")
-                return None
-        try:
-            return int(value)
-        except Exception:
-            print(f"Warning: Could not convert value '{value}' of type '{type(value)}' to int.")
-            return None
-               
-def get_war_stats(battle_tag):
+def get_war_stats(battle_tag, client=coc_client, payload_store=war_payloads):
     """This function retrieves the war stats for a given battle tag from the Clash of Clans API for the 'Pussay Palace' clan.
 
     Args:
         battle_tag (string): The battle tag of the war to retrieve stats for.
+        client (CocClient): The CoC API client to make the request with.
+        payload_store (WarPayloadStore): Payloads already downloaded this run, used instead of the API when present.
 
     Returns:
         Pussay_members_df (pd.DataFrame): A DataFrame containing the war stats for each member of the 'Pussay Palace' clan.
     """
-    war_link = f"https://api.clashofclans.com/v1/clanwarleagues/wars/{battle_tag.replace("#", "%23")}"
-    if debug_print_statements: print("Pussay war link: ", war_link)
-
-    # Make the request to the API
-    war_response = requests.get(war_link, headers=headers)
-
-    if war_response.status_code != 200:
-        error_msg = response_codes.get(war_response.status_code, "Unknown error")
-        raise ValueError(f"API request failed with status code {war_response.status_code}: {error_msg}")
+    war_data = payload_store.take(battle_tag) if payload_store is not None else None
+    if war_data is not None:
+        print(battle_tag, "reusing payload from tag discovery")
+    else:
+        # Make the request to the API, raises CocApiError (a ValueError) on failure
+        war_data = client.get_cwl_war(battle_tag)
+        print(battle_tag, "loaded from CoC API")
+    return parse_war_stats(war_data)
+
+def parse_war_stats(war_data):
+    """Parse a CWL war payload into war stats for each member of the 'Pussay Palace' clan.
 
-    print(battle_tag, war_response)
-    war_data = war_response.json()
+    Args:
+        war_data (dict): War JSON from the /clanwarleagues/wars endpoint.
 
+    Returns:
+        tuple: (war_info_df, state) DataFrame of member stats and the CoC war state.
+    """
     # Check if clan is in a war or if war data is accessible
     if "state" in war_data:
         state = war_data["state"]
@@ -208,32 +66,7 @@ def get_war_stats(battle_tag):
     
     #### Want a dataframe for each member countaining the following:
     # Name, Battleday, TH level, Attack stars, Attack %, Attack Duration, Defense stars, Defense %, Opponent TH level, season
-
-    
-    # # Finding if Pussay is stored as clan or opponent
-    Pussay_clan_or_opponent = "clan" if war_data["clan"]["name"] == clan_name else "opponent"
-    Opponent_clan_or_opponent = "opponent" if Pussay_clan_or_opponent == "clan" else "clan"
-    if debug_print_statements:
-        print("Pussay clan or opponent: ", Pussay_clan_or_opponent)
-        print("Opponent clan name: ", war_data[Opponent_clan_or_opponent]["name"])
-
-    # Empty array to store data in
-    member_array = []
-
-    # Search through each member and collect data
-    for member_index in range(len(war_data[Pussay_clan_or_opponent]["members"])):
-        member_info = war_data[Pussay_clan_or_opponent]["members"][member_index]
-        
-        # Collect data using 'member' class
-        clan_member = member(member_info)
-        clan_member.find_attacker_TH_level(war_data[Opponent_clan_or_opponent])
-
-        member_array.append(clan_member)
-        # print(clan_member)
-    assert len(member_array) == len(war_data[Pussay_clan_or_opponent]["members"])
-
-    # Store information in a dataframe
-    war_info_df = pd.DataFrame([m.to_dataframe_row() for m in member_array])
+    war_info_df = parse_war_members(war_data, clan_name)
     # Add a 'season' column to the DataFrame if 'season' is available in war_data
     season = war_data.get("season", None)
     if season is not None:
@@ -250,16 +83,91 @@ class WarDataManager:
             status_table: Table in Supabase tracking war status
         """
         self.status_table = status_table
-        
+        self.status_index = None    # wartag -> war status record, once load_status_index has run
+        self.pending_status = {}    # wartag -> war status record waiting for flush_status
+        self.pending_rollups = set()    # (tag, season) pairs whose player_season_stats await flush_status
+        self.status_lock = threading.Lock() # Wars may be processed from several threads
+
+    def load_status_index(self):
+        """
+        Load the whole war status table into an in-memory index keyed by wartag.
+        Status lookups, updates and the summary are served from it until flush_status.
+        """
+        war_status_data = fetch_all_rows(supabase, self.status_table, order_by="wartag")
+        self.status_index = {record["wartag"]: record for record in war_status_data or []}
+        self.pending_status = {}
+        self.pending_rollups = set()
+        print(f"Loaded {len(self.status_index)} war status records.")
+
+    def flush_status(self):
+        """
+        Write all war status changes made since load_status_index in one batched upsert
+
+        The player_season_stats rollups of the saved wars are refreshed first, in one call,
+        so a war is only marked as loaded once its stats are in the rollup.
+
+        Raises:
+            ValueError: If the rollup refresh or the status upsert fails. The rollup keys and
+                status records are kept pending for the next flush, the statuses are not written.
+        """
+        with self.status_lock:
+            records = list(self.pending_status.values())
+            rollup_keys = self.pending_rollups
+            self.pending_status = {}
+            self.pending_rollups = set()
+        try:
+            self.refresh_rollups(rollup_keys)
+        except ValueError as e:
+            self.requeue_pending(records, rollup_keys)
+            raise ValueError(f"{e}. {len(records)} war status update(s) kept for the next flush.")
+        if not records:
+            return
+        try:
+            supabase.table(self.status_table).upsert(records, on_conflict="wartag").execute()
+        except Exception as e:
+            self.requeue_pending(records)
+            raise ValueError(f"Error upserting {len(records)} war status update(s), kept for the next flush: {e}")
+        print(f"📝 Saved {len(records)} war status update(s).")
+
+    def requeue_pending(self, records, rollup_keys=()):
+        """Put status records and rollup keys a failed flush took back, without overwriting newer records."""
+        with self.status_lock:
+            self.pending_rollups |= set(rollup_keys)
+            for record in records:
+                self.pending_status.setdefault(record["wartag"], record)
+
+    def refresh_rollups(self, keys):
+        """
+        Recompute the player_season_stats rows of some players and seasons from war_data,
+        using the `refresh_player_season_stats` database function (sql/004_player_season_stats.sql).
+        The rows are rebuilt rather than incremented, so refreshing a key twice is harmless.
+
+        Args:
+            keys: Iterable of (tag, season) pairs
+        """
+        keys = sorted(key for key in set(keys) if key[0] is not None and key[1] is not None)
+        if not keys:
+            return
+        try:
+            supabase.rpc("refresh_player_season_stats", {
+                "tags": [tag for tag, _ in keys],
+                "seasons": [season for _, season in keys],
+            }).execute()
+        except Exception as e:
+            raise ValueError(f"Error refreshing player_season_stats for {len(keys)} player season(s): {e}")
+        print(f"📊 Refreshed player_season_stats for {len(keys)} player season(s).")
+
     def get_war_status(self, wartag):
         """
-        Get the war status for a specific war tag from Supabase
+        Get the war status for a specific war tag from the status index, or Supabase if no index is loaded
 
         Args:
             wartag: The war tag to look up
         Returns:
             dict or None: War status record if found, None otherwise
         """
+        if self.status_index is not None:
+            return self.status_index.get(wartag)
         war_status = supabase.table(self.status_table).select("*").eq("wartag", wartag).execute().data
         if war_status and len(war_status) > 0:
             # return single record as dict (not a DataFrame) so callers get scalars
@@ -317,114 +225,67 @@ class WarDataManager:
             # This shouldn't normally happen, but default to notLoaded
             return "notLoaded"
         
-    def clean_record_for_supabase(self, record, schema=WAR_DATA_SCHEMA):
-        cleaned = {}
-        for key, dtype in schema.items():
-            val = record.get(key)
-            if dtype is int:
-                try:
-                    # Handle None, np.nan, and string 'nan'
-                    if val is None:
-                        cleaned[key] = None
-                    elif isinstance(val, float) and (np.isnan(val) or str(val).lower() == "nan"):
-                        cleaned[key] = None
-                    elif isinstance(val, str) and val.strip().lower() == "nan":
-                        cleaned[key] = None
-                    else:
-                        cleaned[key] = int(float(val))
-                except Exception:
-                    cleaned[key] = None
-            elif dtype is str:
-                # Handle None and clean up strings
-                if val is None:
-                    cleaned[key] = None
-                else:
-                    cleaned[key] = str(val).strip()
-            else:
-                cleaned[key] = val
-        return cleaned
-    
     def save_war_data(self, wartag, war_df, coc_war_status, season, battleday):
-            # Add metadata
-        war_df['wartag'] = wartag
-        war_df['season'] = season
+        """
+        Save a war's member rows and war status to Supabase
+
+        Member rows are written with one batched upsert on (wartag, tag), then the
+        player_season_stats rollup of those members is refreshed and the war status is
+        upserted on wartag, so a war costs three requests. With the status index loaded
+        the rollup refresh and status upsert are deferred to flush_status, which batches
+        them for every war saved.
+
+        Args:
+            wartag: The war tag
+            war_df: DataFrame of member stats, may be empty
+            coc_war_status: Status returned from COC API
+            season: Season identifier (e.g., "2025-10")
+            battleday: CWL day number (e.g., 1-7)
+        """
+        loading_status = self.determine_loading_status(coc_war_status)
         battleday = int(battleday) if battleday is not None else None
-        war_df['battleday'] = battleday
 
         if war_df is not None and not war_df.empty:
-            clean_df = war_df.replace([np.inf, -np.inf], None)
-            clean_df = clean_df.map(lambda x: None if pd.isnull(x) else x)
+            # Add metadata
+            war_df['wartag'] = wartag
+            war_df['season'] = season
+            war_df['battleday'] = battleday
+
+            records = frame_to_records(war_df)
+            print(f"Saving {len(records)} war data records for war {wartag}.")
 
-            records = clean_df.to_dict(orient='records')
-            if records is None or len(records) == 0:
-                raise ValueError(f"No war data records to save for {wartag}.")
+            try:
+                response = supabase.table("war_data").upsert(records, on_conflict="wartag,tag").execute()
+            except Exception as e:
+                raise ValueError(f"Error upserting war data to Supabase: {e}")
+            if response.data is None:
+                raise ValueError(f"Supabase response data is None for war data upsert of war {wartag}.")
+
+            rollup_keys = {(record.get("tag"), season) for record in records}
+            if self.status_index is not None:
+                with self.status_lock:
+                    self.pending_rollups |= rollup_keys
             else:
-                print(f"Saving {len(records)} war data records for war {wartag}.")
-            for record in records:
-                record = self.clean_record_for_supabase(record)
-                
-                if record is None:
-                    print(f"Skipping empty record for war {wartag}.")
-                    continue
-
-                try:
-                    # Check if the row exists (by wartag and tag)
-                    query = supabase.table("war_data") \
-                        .select("wartag,tag") \
-                        .eq("wartag", record["wartag"]) \
-                        .eq("tag", record["tag"]) \
-                        .execute()
-                    exists = query.data and len(query.data) > 0
-
-                    if not exists:
-                        print(f"Inserted new war data for {record['tag']} in war {record['wartag']}")
-                        # Insert new row
-                        res = supabase.table("war_data").insert(record).execute()
-                        # optional: print(res) to see DB response
-                    else:
-                        print(f"Updated war data for {record['tag']} in war {record['wartag']}")
-                        # Update existing row
-                        response = supabase.table("war_data") \
-                            .update(record) \
-                            .eq("wartag", record["wartag"]) \
-                            .eq("tag", record["tag"]) \
-                            .execute()
-                    
-                    if response.data is None:
-                        raise ValueError(f"Supabase response data is None for war data upsert of {record['tag']} in war {record['wartag']}.")
-                    # else:
-                    #     print(f"inserted/updated {len(response.data)} record(s) for war data of {record['tag']} in war {record['wartag']}.")
-
-                except Exception as e:
-                    print(record)
-                    raise ValueError(f"Error upserting war data to Supabase: {e}")
+                self.refresh_rollups(rollup_keys)
 
         # Upsert war status (this is the critical part)
         try:
-            # Check if war_status row exists
-            status_query = supabase.table("war_status") \
-                .select("id") \
-                .eq("wartag", wartag) \
-                .execute()
-            status_exists = status_query.data and len(status_query.data) > 0
-
             war_status_record = {
                 "wartag": wartag,
                 "coc_war_status": coc_war_status,
                 "loading_status": loading_status,
                 "season": season,
-                "battleday": battleday
+                "battleday": battleday,
+                "last_updated": datetime.now(timezone.utc).isoformat()
             }
-
-            if not status_exists:
-                print(f"📝 Inserting new war status for {wartag}")
-                supabase.table("war_status").insert(war_status_record).execute()
+            if self.status_index is not None:
+                # Written back in one batch by flush_status
+                with self.status_lock:
+                    self.status_index[wartag] = war_status_record
+                    self.pending_status[wartag] = war_status_record
             else:
-                print(f"📝 Updating war status for {wartag} → {loading_status}")
-                supabase.table("war_status") \
-                    .update(war_status_record) \
-                    .eq("wartag", wartag) \
-                    .execute()
+                print(f"📝 Upserting war status for {wartag} → {loading_status}")
+                supabase.table(self.status_table).upsert(war_status_record, on_conflict="wartag").execute()
 
             status_symbol = "✓" if loading_status == "completed" else "⋯"
             if coc_war_status == "notInWar" or loading_status in ["Error - too old", "notLoaded"]:
@@ -453,7 +314,7 @@ class WarDataManager:
         else:
             return None
     
-    def process_war(self, wartag, get_war_stats_func, season=None,   battleday=None):
+    def process_war(self, wartag, get_war_stats_func, season=None,   battleday=None, load_cached=False):
         """
         Process a single war - either load from cache or fetch from API
         
@@ -463,12 +324,18 @@ class WarDataManager:
                                Should return (war_df, coc_war_status)
             season: Season identifier (e.g., "2025-10") - will be added to DataFrame
             cwl_day: CWL day number (e.g., 1-7) - will be added to DataFrame
+            load_cached: Download the saved rows of wars that are skipped or fail to load.
+                         Defaults to False, skipped wars then return an empty DataFrame.
             
         Returns:
             tuple: (war_df, coc_war_status, loading_status, was_cached)
         """
         # Check if we should load from API
         if not self.should_load_war(wartag):
+            if not load_cached:
+                war_status = self.get_war_status(wartag)
+                return pd.DataFrame(), war_status['coc_war_status'], war_status['loading_status'], False
+
             # Try cache — but if none, just return immediately and do NOT call API
             cached_data = self.load_cached_war_data(wartag)
             if cached_data is not None:
@@ -520,6 +387,9 @@ class WarDataManager:
                 return pd.DataFrame(), "notInWar", "Error - too old", False
 
 
+            if not load_cached:
+                raise
+
             # Try to return cached data if available
             cached_data = self.load_cached_war_data(wartag)
             if cached_data is not None:
@@ -538,6 +408,22 @@ class WarDataManager:
                 )
             raise
     
+    def plan_wars(self, plan_view="wars_to_load"):
+        """
+        Get the battle tags of wars that still need loading. The `wars_to_load` view
+        (sql/005_wars_to_load.sql) joins battle_tags to war_status in the database, so
+        completed and too-old wars are never downloaded or sent back in the request.
+
+        Args:
+            plan_view: View in Supabase listing the battle tags still to load
+
+        Returns:
+            list: battle_tags records (wartag, season, battleday) needing work
+        """
+        wars = fetch_all_rows(supabase, plan_view, "wartag,season,battleday", order_by=["season", "battleday", "wartag"])
+        print(f"Planned {len(wars)} war(s) to load.")
+        return wars
+
     def get_status_summary(self):
         """
         Get a summary of all tracked wars
@@ -545,8 +431,11 @@ class WarDataManager:
         Returns:
             dict: Summary statistics
         """
-        # Load the latest status data from Supabase
-        war_status_data = supabase.table(self.status_table).select("*").execute().data
+        # Use the status index if loaded, otherwise the latest status data from Supabase
+        if self.status_index is not None:
+            war_status_data = list(self.status_index.values())
+        else:
+            war_status_data = fetch_all_rows(supabase, self.status_table, order_by="wartag")
         status_df = pd.DataFrame(war_status_data) if war_status_data else pd.DataFrame(columns=[
             'wartag', 'coc_war_status', 'loading_status', 'last_updated', 'data_file'
         ])
@@ -610,114 +499,79 @@ def save_war_data_to_csv(all_wars_data, war_status_data):
         status_df.to_csv(status_file, index=False)
         print(f"✅ War status backed up to: {status_file}")
 
-def load_warData_supabase():
-    # Initialize the manager
-    war_manager = WarDataManager(
-        status_table="war_status"
-    )
-    
-    # Load your battle tags from supabase
-    Pussay_wars = supabase.table("battle_tags").select("*").execute().data
-    Pussay_wars_df = pd.DataFrame(Pussay_wars)
+def ingest_war(war_manager, wartag, season, battleday):
+    """Fetch, parse and save a single war. Errors are caught and reported so other wars carry on.
 
-    # Process each war
-    all_wars_data = []
+    Args:
+        war_manager (WarDataManager): Manager tracking the war status
+        wartag (str): The war tag
+        season (str): Season identifier (e.g., "2025-10")
+        battleday (int): CWL day number (e.g., 1-7)
+
+    Returns:
+        pd.DataFrame or None: The war data, None if the war could not be loaded
+    """
+    print(f"\n--- Season {season}, Battle Day {battleday}: {wartag} ---")
     
-    for idx, row in Pussay_wars_df.iterrows():
-        wartag = row['wartag']
-        battleday = row['battleday']
-        season = row['season']
-        
-        # Skip placeholder tags
-        if wartag == "#0":
-            print(f"○ Skipping placeholder war tag for Season {season}, Battle Day {battleday}")
-            continue
+    try:
+        # Process the war (will use cache if completed)
+        war_df, coc_status, loading_status, was_cached = war_manager.process_war(
+            wartag,
+            get_war_stats,  # Your existing code
+            season=season,
+            battleday=battleday
+        )
         
-        print(f"\n--- Season {season}, Battle Day {battleday}: {wartag} ---")
+        # Add metadata
+        war_df['battleday'] = battleday
+        war_df['season'] = season
+        war_df['wartag'] = wartag
         
-        try:
-            # Process the war (will use cache if completed)
-            war_df, coc_status, loading_status, was_cached = war_manager.process_war(
-                wartag,
-                get_war_stats,  # Your existing code
-                season=season,
-                battleday=battleday
-            )
-            
-            # Add metadata
-            war_df['battleday'] = battleday
-            war_df['season'] = season
-            war_df['wartag'] = wartag
-            
-            all_wars_data.append(war_df)
+        if was_cached:
+            print(f"  → {wartag} loaded from cache")
+        elif coc_status == "notInWar" or loading_status in ["Error - too old", "notLoaded"]:
+            pass
+        else:
+            print(f"  → {wartag} fetched from API")
+        return war_df
             
-            if was_cached:
-                print(f"  → Loaded from cache")
-            elif coc_status == "notInWar" or loading_status in ["Error - too old", "notLoaded"]:
-                pass
-            else:
-                print(f"  → Fetched from API")
-                
-        except ValueError as e:
-            # Handle "notInWar" or other API errors
-            print(f"✗ Could not load war {wartag}: {e}")
-            continue
-    
-    # Print summary
-    print(war_manager)
-if __name__ == "__main__":
-    # load_warData_supabase()
-    # Initialize the manager
+    except ValueError as e:
+        # Handle "notInWar" or other API errors
+        print(f"✗ Could not load war {wartag}: {e}")
+    except Exception as e:
+        print(f"✗ Unexpected error loading war {wartag}: {e}")
+    return None
+
+def load_warData_supabase(max_workers=max_war_workers):
+    """Load every war in the battle_tags table into Supabase.
+
+    Args:
+        max_workers (int): Number of wars ingested in parallel, 1 processes them one after another
+    """
+    # Initialize the manager and load the war status table once for the run
     war_manager = WarDataManager(
         status_table="war_status"
     )
+    war_manager.load_status_index()
     
-    # Load your battle tags from supabase
-    Pussay_wars = supabase.table("battle_tags").select("*").execute().data
-    Pussay_wars_df = pd.DataFrame(Pussay_wars)
+    # Load the battle tags of wars still needing work, placeholder and finished wars are filtered out by Supabase
+    wars = [(row['wartag'], row['season'], row['battleday']) for row in war_manager.plan_wars()]
 
     # Process each war
-    all_wars_data = []
-    
-    for idx, row in Pussay_wars_df.iterrows():
-        wartag = row['wartag']
-        battleday = row['battleday']
-        season = row['season']
-        
-        # Skip placeholder tags
-        if wartag == "#0":
-            print(f"○ Skipping placeholder war tag for Season {season}, Battle Day {battleday}")
-            continue
-        
-        print(f"\n--- Season {season}, Battle Day {battleday}: {wartag} ---")
-        
-        try:
-            # Process the war (will use cache if completed)
-            war_df, coc_status, loading_status, was_cached = war_manager.process_war(
-                wartag,
-                get_war_stats,  # Your existing code
-                season=season,
-                battleday=battleday
-            )
-            
-            # Add metadata
-            war_df['battleday'] = battleday
-            war_df['season'] = season
-            war_df['wartag'] = wartag
-            
-            all_wars_data.append(war_df)
-            
-            if was_cached:
-                print(f"  → Loaded from cache")
-            elif coc_status == "notInWar" or loading_status in ["Error - too old", "notLoaded"]:
-                pass
-            else:
-                print(f"  → Fetched from API")
-                
-        except ValueError as e:
-            # Handle "notInWar" or other API errors
-            print(f"✗ Could not load war {wartag}: {e}")
-            continue
+    try:
+        if max_workers > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                list(executor.map(lambda war: ingest_war(war_manager, *war), wars))
+        else:
+            for war in wars:
+                ingest_war(war_manager, *war)
+    finally:
+        # Write every war status change back in one batch, even if a war failed unexpectedly.
+        # Raises if the rollup or the statuses can't be written, so the run exits with an error
+        war_manager.flush_status()
     
     # Print summary
-    print(war_manager)
\ No newline at end of file
+    print(war_manager)
+
+if __name__ == "__main__":
+    load_warData_supabase()
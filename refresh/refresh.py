@@ -1,17 +1,28 @@
+import argparse
 from refresh.Find_battletags import load_battle_tags_supabase
 from refresh.COC_client import clan_data
 from refresh.reading_WarData import load_warData_supabase
+from refresh.daemon import RefreshDaemon, default_poll_interval
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh CWL war data from the CoC API into Supabase.")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Keep running and poll each war according to its state instead of refreshing once")
+    parser.add_argument("--poll-minutes", type=float, default=default_poll_interval / 60,
+                        help="Minutes between polls of a war in progress (daemon mode only)")
+    args = parser.parse_args()
+
     clan_tag = clan_data["clan_tag"]
     clan_name = clan_data["clan_name"]
     base_url = clan_data["base_url"]
     url = clan_data["url"]
     headers = clan_data["headers"]
 
-    # Find and Load battle tags into Supabase
-    load_battle_tags_supabase(clan_tag)
-
-    # read individual war data
-    load_warData_supabase()
+    if args.daemon:
+        RefreshDaemon(clan_tag, poll_interval=args.poll_minutes * 60).run()
+    else:
+        # Find and Load battle tags into Supabase
+        load_battle_tags_supabase(clan_tag)
 
+        # read individual war data
+        load_warData_supabase()
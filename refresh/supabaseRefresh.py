@@ -10,11 +10,7 @@ SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
 supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
 
-def store_battle_tag(battleday, wartag, season):
-    data = {
-        "battleday": battleday,
-        "wartag": wartag,
-        "season": season
-    }
-    response = supabase.table("battle_tags").insert(data).execute()
+def store_battle_tags(rows):
+    """Insert several battle tag rows (dicts of battleday, wartag, season) in one request."""
+    response = supabase.table("battle_tags").insert(rows).execute()
     return response.data
\ No newline at end of file
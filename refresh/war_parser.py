@@ -0,0 +1,125 @@
+"""Columnar parser for CWL war payloads.
+
+Turns the clan's side of a `/clanwarleagues/wars/{tag}` payload into a typed DataFrame
+in one pass over the members, looking opponent townhall levels up by tag.
+"""
+
+import numpy as np
+import pandas as pd
+
+WAR_DATA_SCHEMA = {
+    'tag': str,
+    'name': str,
+    'townhallLevel': int,
+    'mapPosition': int,
+    'attacker_townhallLevel': int,
+    'defender_townhallLevel': int,
+    'attack_th_diff': int,
+    'defense_th_diff': int,
+    'attack_stars': int,
+    'attack_percentage': int,
+    'attack_duration': int,
+    'defender_tag': str,
+    'defense_stars': int,
+    'defense_percentage': int,
+    'defense_duration': int,
+    'attacker_tag': str,
+    'season': str,
+    'battleday': int,
+    'wartag': str
+}
+
+# Columns parsed from the war payload, the rest of the schema is war metadata
+MEMBER_COLUMNS = list(WAR_DATA_SCHEMA)[:16]
+
+
+def parse_war_members(war_data, clan_name):
+    """Parse the clan's members of a war payload into a typed DataFrame.
+
+    Args:
+        war_data (dict): War JSON from the /clanwarleagues/wars endpoint.
+        clan_name (str): Name of the clan to parse, either the war's "clan" or "opponent".
+
+    Returns:
+        pd.DataFrame: One row per member with MEMBER_COLUMNS, integer columns use the nullable Int64 dtype.
+    """
+    side, other_side = ("clan", "opponent") if war_data["clan"]["name"] == clan_name else ("opponent", "clan")
+    members = war_data[side]["members"]
+    opponent_th = {opponent["tag"]: opponent["townhallLevel"] for opponent in war_data[other_side]["members"]}
+
+    columns = {column: [] for column in MEMBER_COLUMNS if not column.endswith("th_diff")}
+    for member in members:
+        columns["tag"].append(member["tag"])
+        columns["name"].append(member["name"])
+        columns["townhallLevel"].append(member["townhallLevel"])
+        columns["mapPosition"].append(member["mapPosition"])
+
+        # Only the first attack is recorded, CWL allows one per member
+        attack = member["attacks"][0] if member.get("attacks") else None
+        columns["attack_stars"].append(attack["stars"] if attack else None)
+        columns["attack_percentage"].append(attack["destructionPercentage"] if attack else None)
+        columns["attack_duration"].append(attack["duration"] if attack else None)
+        columns["defender_tag"].append(attack["defenderTag"] if attack else None)
+        columns["defender_townhallLevel"].append(opponent_th.get(attack["defenderTag"]) if attack else None)
+
+        defense = member.get("bestOpponentAttack")
+        columns["defense_stars"].append(defense["stars"] if defense else None)
+        columns["defense_percentage"].append(defense["destructionPercentage"] if defense else None)
+        columns["defense_duration"].append(defense["duration"] if defense else None)
+        columns["attacker_tag"].append(defense["attackerTag"] if defense else None)
+        columns["attacker_townhallLevel"].append(opponent_th.get(defense["attackerTag"]) if defense else None)
+
+    # None becomes NaN in float arrays, so missing values survive the arithmetic below
+    numbers = {column: np.array(values, dtype="float64") for column, values in columns.items()
+               if WAR_DATA_SCHEMA[column] is int}
+    # Positive means the opponent had the higher townhall
+    numbers["attack_th_diff"] = numbers["defender_townhallLevel"] - numbers["townhallLevel"]
+    numbers["defense_th_diff"] = numbers["attacker_townhallLevel"] - numbers["townhallLevel"]
+
+    return pd.DataFrame({
+        column: _to_int_array(numbers[column]) if WAR_DATA_SCHEMA[column] is int else np.array(columns[column], dtype=object)
+        for column in MEMBER_COLUMNS
+    })
+
+
+def _to_int_array(values):
+    """Convert a float array with NaN for missing values to a nullable Int64 array."""
+    missing = np.isnan(values)
+    return pd.arrays.IntegerArray(np.where(missing, 0, values).astype(np.int64), missing)
+
+
+def frame_to_records(war_df, schema=WAR_DATA_SCHEMA):
+    """Convert a war DataFrame to Supabase records, column by column.
+
+    Integer columns are truncated to Python ints; None, NaN, infinite and unparsable values
+    (including the string "nan") become None. String columns are stripped, with None and NaN
+    becoming None. Columns missing from the frame are None in every record.
+
+    Args:
+        war_df (pd.DataFrame): War data with some or all of the schema columns.
+        schema (dict): Column name to type (int or str).
+
+    Returns:
+        list: One dict per row with every schema column.
+    """
+    columns = {}
+    for key, dtype in schema.items():
+        if key not in war_df.columns:
+            columns[key] = [None] * len(war_df)
+            continue
+        values = war_df[key]
+        if dtype is int:
+            if pd.api.types.is_numeric_dtype(values.dtype):
+                numbers = values.to_numpy(dtype="float64", na_value=np.nan)
+            else:
+                numbers = pd.to_numeric(values, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+            valid = np.isfinite(numbers)
+            converted = np.trunc(np.where(valid, numbers, 0)).astype(np.int64).astype(object) # Python ints
+            converted[~valid] = None
+            columns[key] = converted.tolist()
+        elif dtype is str:
+            objects = values.to_numpy(dtype=object)
+            columns[key] = [None if pd.isna(value) else str(value).strip() for value in objects]
+        else:
+            columns[key] = values.to_numpy(dtype=object).tolist()
+    return [dict(zip(columns, row)) for row in zip(*columns.values())]
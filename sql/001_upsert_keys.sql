@@ -0,0 +1,6 @@
+-- Unique keys required by the batched upserts in refresh/reading_WarData.py
+-- (WarDataManager.save_war_data upserts on war_data (wartag, tag) and war_status (wartag)).
+-- Remove any duplicate rows before running, otherwise the index creation fails.
+
+create unique index if not exists war_data_wartag_tag_key on public.war_data (wartag, tag);
+create unique index if not exists war_status_wartag_key on public.war_status (wartag);
@@ -0,0 +1,44 @@
+-- Per-player averages for the webapp index page (webapp/services/index_data.py get_index_data).
+-- Returns one row per player for the most recent season (scope 'recent', season set) and one
+-- per player over all seasons (scope 'all_time', season null), so the page needs a single
+-- round trip whose size depends on the number of players rather than the number of attacks.
+
+create or replace function public.player_averages(player_name text default null)
+returns table (
+    scope text,
+    season text,
+    name text,
+    attack_th_diff numeric,
+    defense_th_diff numeric,
+    attack_stars numeric,
+    attack_percentage numeric,
+    defense_stars numeric,
+    defense_percentage numeric
+)
+language sql
+stable
+as $$
+    with filtered as (
+        select * from public.war_data w
+        where player_averages.player_name is null or w.name = player_averages.player_name
+    ),
+    recent as (
+        select max(season) as season from public.war_data
+    )
+    select 'all_time', null::text, f.name,
+           round(avg(f.attack_th_diff)::numeric, 2), round(avg(f.defense_th_diff)::numeric, 2),
+           round(avg(f.attack_stars)::numeric, 2), round(avg(f.attack_percentage)::numeric, 2),
+           round(avg(f.defense_stars)::numeric, 2), round(avg(f.defense_percentage)::numeric, 2)
+    from filtered f
+    group by f.name
+    union all
+    select 'recent', r.season, f.name,
+           round(avg(f.attack_th_diff)::numeric, 2), round(avg(f.defense_th_diff)::numeric, 2),
+           round(avg(f.attack_stars)::numeric, 2), round(avg(f.attack_percentage)::numeric, 2),
+           round(avg(f.defense_stars)::numeric, 2), round(avg(f.defense_percentage)::numeric, 2)
+    from filtered f
+    join recent r on f.season = r.season
+    group by r.season, f.name
+$$;
+
+grant execute on function public.player_averages(text) to anon, authenticated;
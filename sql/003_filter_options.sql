@@ -0,0 +1,34 @@
+-- Distinct players and seasons for the webapp filter dropdowns
+-- (webapp/services/index_data.py get_filter_options).
+-- Each list is read with a loose index scan: the recursive query jumps from one distinct
+-- value to the next through the index, so the cost grows with the number of players and
+-- seasons rather than the number of war_data rows.
+
+create index if not exists war_data_name_idx on public.war_data (name);
+create index if not exists war_data_season_idx on public.war_data (season);
+
+create or replace function public.filter_options()
+returns table (kind text, value text)
+language sql
+stable
+as $$
+    with recursive players(name) as (
+        (select name from public.war_data where name is not null order by name limit 1)
+        union all
+        select (select w.name from public.war_data w where w.name > p.name order by w.name limit 1)
+        from players p
+        where p.name is not null
+    ),
+    seasons(season) as (
+        (select season from public.war_data where season is not null order by season limit 1)
+        union all
+        select (select w.season from public.war_data w where w.season > s.season order by w.season limit 1)
+        from seasons s
+        where s.season is not null
+    )
+    select 'player', name from players where name is not null
+    union all
+    select 'season', season from seasons where season is not null
+$$;
+
+grant execute on function public.filter_options() to anon, authenticated;
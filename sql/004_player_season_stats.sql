@@ -0,0 +1,161 @@
+-- Per player and season rollup of war_data, kept up to date by the refresh job.
+-- WarDataManager (refresh/reading_WarData.py) calls refresh_player_season_stats with the
+-- (tag, season) pairs of every war it saves, and the webapp reads averages from the rollup
+-- (sum / count per stat) instead of scanning war_data, so reads grow with players x seasons
+-- rather than with the number of attacks. Run after 001-003; the last statement backfills
+-- the rollup from the existing war_data.
+
+create table if not exists public.player_season_stats (
+    tag text not null,
+    season text not null,
+    name text,
+    wars integer not null default 0,
+    "townhallLevel_sum" numeric not null default 0,
+    "townhallLevel_count" integer not null default 0,
+    "mapPosition_sum" numeric not null default 0,
+    "mapPosition_count" integer not null default 0,
+    "attacker_townhallLevel_sum" numeric not null default 0,
+    "attacker_townhallLevel_count" integer not null default 0,
+    "defender_townhallLevel_sum" numeric not null default 0,
+    "defender_townhallLevel_count" integer not null default 0,
+    attack_th_diff_sum numeric not null default 0,
+    attack_th_diff_count integer not null default 0,
+    defense_th_diff_sum numeric not null default 0,
+    defense_th_diff_count integer not null default 0,
+    attack_stars_sum numeric not null default 0,
+    attack_stars_count integer not null default 0,
+    attack_percentage_sum numeric not null default 0,
+    attack_percentage_count integer not null default 0,
+    attack_duration_sum numeric not null default 0,
+    attack_duration_count integer not null default 0,
+    defense_stars_sum numeric not null default 0,
+    defense_stars_count integer not null default 0,
+    defense_percentage_sum numeric not null default 0,
+    defense_percentage_count integer not null default 0,
+    defense_duration_sum numeric not null default 0,
+    defense_duration_count integer not null default 0,
+    updated_at timestamptz not null default now(),
+    primary key (tag, season)
+);
+
+create index if not exists player_season_stats_season_name_idx on public.player_season_stats (season, name);
+
+grant select on public.player_season_stats to anon, authenticated;
+
+-- Recompute the rollup rows of the given (tag, season) pairs from war_data.
+-- tags and seasons are parallel arrays. Rows are rebuilt from scratch rather than
+-- incremented, so calling it again for the same pairs (e.g. after a war is re-saved)
+-- gives the same result, and pairs with no war_data left are removed.
+create or replace function public.refresh_player_season_stats(tags text[], seasons text[])
+returns integer
+language sql
+as $$
+    with affected as (
+        select distinct k.tag, k.season
+        from unnest(refresh_player_season_stats.tags, refresh_player_season_stats.seasons) as k(tag, season)
+    ),
+    removed as (
+        delete from public.player_season_stats s
+        using affected a
+        where s.tag = a.tag and s.season = a.season
+          and not exists (select 1 from public.war_data w where w.tag = a.tag and w.season = a.season)
+    ),
+    upserted as (
+        insert into public.player_season_stats (tag, season, name, wars,
+            "townhallLevel_sum", "townhallLevel_count", "mapPosition_sum", "mapPosition_count",
+            "attacker_townhallLevel_sum", "attacker_townhallLevel_count", "defender_townhallLevel_sum", "defender_townhallLevel_count",
+            attack_th_diff_sum, attack_th_diff_count, defense_th_diff_sum, defense_th_diff_count,
+            attack_stars_sum, attack_stars_count, attack_percentage_sum, attack_percentage_count,
+            attack_duration_sum, attack_duration_count, defense_stars_sum, defense_stars_count,
+            defense_percentage_sum, defense_percentage_count, defense_duration_sum, defense_duration_count,
+            updated_at)
+        select w.tag, w.season, (array_agg(w.name order by w.battleday desc nulls last))[1], count(*),
+           coalesce(sum(w."townhallLevel"), 0), count(w."townhallLevel"),
+           coalesce(sum(w."mapPosition"), 0), count(w."mapPosition"),
+           coalesce(sum(w."attacker_townhallLevel"), 0), count(w."attacker_townhallLevel"),
+           coalesce(sum(w."defender_townhallLevel"), 0), count(w."defender_townhallLevel"),
+           coalesce(sum(w.attack_th_diff), 0), count(w.attack_th_diff),
+           coalesce(sum(w.defense_th_diff), 0), count(w.defense_th_diff),
+           coalesce(sum(w.attack_stars), 0), count(w.attack_stars),
+           coalesce(sum(w.attack_percentage), 0), count(w.attack_percentage),
+           coalesce(sum(w.attack_duration), 0), count(w.attack_duration),
+           coalesce(sum(w.defense_stars), 0), count(w.defense_stars),
+           coalesce(sum(w.defense_percentage), 0), count(w.defense_percentage),
+           coalesce(sum(w.defense_duration), 0), count(w.defense_duration),
+           now()
+        from public.war_data w
+        join affected a on w.tag = a.tag and w.season = a.season
+        group by w.tag, w.season
+        on conflict (tag, season) do update set
+            name = excluded.name, wars = excluded.wars,
+            "townhallLevel_sum" = excluded."townhallLevel_sum", "townhallLevel_count" = excluded."townhallLevel_count",
+            "mapPosition_sum" = excluded."mapPosition_sum", "mapPosition_count" = excluded."mapPosition_count",
+            "attacker_townhallLevel_sum" = excluded."attacker_townhallLevel_sum", "attacker_townhallLevel_count" = excluded."attacker_townhallLevel_count",
+            "defender_townhallLevel_sum" = excluded."defender_townhallLevel_sum", "defender_townhallLevel_count" = excluded."defender_townhallLevel_count",
+            attack_th_diff_sum = excluded.attack_th_diff_sum, attack_th_diff_count = excluded.attack_th_diff_count,
+            defense_th_diff_sum = excluded.defense_th_diff_sum, defense_th_diff_count = excluded.defense_th_diff_count,
+            attack_stars_sum = excluded.attack_stars_sum, attack_stars_count = excluded.attack_stars_count,
+            attack_percentage_sum = excluded.attack_percentage_sum, attack_percentage_count = excluded.attack_percentage_count,
+            attack_duration_sum = excluded.attack_duration_sum, attack_duration_count = excluded.attack_duration_count,
+            defense_stars_sum = excluded.defense_stars_sum, defense_stars_count = excluded.defense_stars_count,
+            defense_percentage_sum = excluded.defense_percentage_sum, defense_percentage_count = excluded.defense_percentage_count,
+            defense_duration_sum = excluded.defense_duration_sum, defense_duration_count = excluded.defense_duration_count,
+            updated_at = excluded.updated_at
+        returning 1
+    )
+    select count(*)::integer from upserted
+$$;
+
+revoke execute on function public.refresh_player_season_stats(text[], text[]) from public, anon, authenticated;
+
+-- player_averages (sql/002_player_averages.sql) reading the rollup: same signature and
+-- columns, averages are the summed totals divided by the summed counts.
+create or replace function public.player_averages(player_name text default null)
+returns table (
+    scope text,
+    season text,
+    name text,
+    attack_th_diff numeric,
+    defense_th_diff numeric,
+    attack_stars numeric,
+    attack_percentage numeric,
+    defense_stars numeric,
+    defense_percentage numeric
+)
+language sql
+stable
+as $$
+    with filtered as (
+        select * from public.player_season_stats s
+        where player_averages.player_name is null or s.name = player_averages.player_name
+    ),
+    recent as (
+        select max(season) as season from public.player_season_stats
+    )
+    select 'all_time', null::text, f.name,
+           round(sum(f.attack_th_diff_sum) / nullif(sum(f.attack_th_diff_count), 0), 2),
+           round(sum(f.defense_th_diff_sum) / nullif(sum(f.defense_th_diff_count), 0), 2),
+           round(sum(f.attack_stars_sum) / nullif(sum(f.attack_stars_count), 0), 2),
+           round(sum(f.attack_percentage_sum) / nullif(sum(f.attack_percentage_count), 0), 2),
+           round(sum(f.defense_stars_sum) / nullif(sum(f.defense_stars_count), 0), 2),
+           round(sum(f.defense_percentage_sum) / nullif(sum(f.defense_percentage_count), 0), 2)
+    from filtered f
+    group by f.name
+    union all
+    select 'recent', r.season, f.name,
+           round(sum(f.attack_th_diff_sum) / nullif(sum(f.attack_th_diff_count), 0), 2),
+           round(sum(f.defense_th_diff_sum) / nullif(sum(f.defense_th_diff_count), 0), 2),
+           round(sum(f.attack_stars_sum) / nullif(sum(f.attack_stars_count), 0), 2),
+           round(sum(f.attack_percentage_sum) / nullif(sum(f.attack_percentage_count), 0), 2),
+           round(sum(f.defense_stars_sum) / nullif(sum(f.defense_stars_count), 0), 2),
+           round(sum(f.defense_percentage_sum) / nullif(sum(f.defense_percentage_count), 0), 2)
+    from filtered f
+    join recent r on f.season = r.season
+    group by r.season, f.name
+$$;
+
+grant execute on function public.player_averages(text) to anon, authenticated;
+
+-- Backfill the rollup from the war_data already stored
+select public.refresh_player_season_stats(array_agg(keys.tag), array_agg(keys.season))
+from (select distinct tag, season from public.war_data where tag is not null and season is not null) keys;
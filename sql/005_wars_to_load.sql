@@ -0,0 +1,17 @@
+-- Battle tags of the wars the refresh job still has to load
+-- (refresh/reading_WarData.py WarDataManager.plan_wars).
+-- The anti-join against war_status runs in the database, so the request stays the same
+-- size however many wars are already completed.
+
+create index if not exists war_status_loading_status_idx on public.war_status (loading_status);
+
+create or replace view public.wars_to_load
+with (security_invoker = true)
+as
+    select b.wartag, b.season, b.battleday
+    from public.battle_tags b
+    left join public.war_status s on s.wartag = b.wartag
+    where b.wartag <> '#0'
+      and (s.loading_status is null or s.loading_status not in ('completed', 'Error - too old'));
+
+revoke all on public.wars_to_load from anon, authenticated;
@@ -0,0 +1,50 @@
+""" Paged reads shared by the refresh scripts (refresh/supabaseRefresh.py) and the webapp
+(webapp/supabase_client.py). Each passes in its own Supabase client.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+PAGE_SIZE = 1000      # Rows per page, PostgREST's default max rows
+FETCH_WORKERS = 4     # Pages fetched at once by fetch_all_rows
+
+def fetch_all_rows(client, table, columns="*", apply_filters=None, order_by="id", page_size=PAGE_SIZE, max_workers=FETCH_WORKERS):
+    """
+    Fetch every row matching a query, paging with range() so results are not truncated
+    at PostgREST's max rows. The first page also returns the exact row count, the
+    remaining pages are then fetched concurrently.
+
+    Args:
+        client: Supabase client to query
+        table: Table to select from
+        columns: Comma separated columns to select
+        apply_filters: Function taking the select query and returning it with filters applied
+        order_by: Column or list of columns giving a unique, stable row order for paging
+        page_size: Rows requested per page, pages shrink to the server cap if it is lower
+        max_workers: Maximum number of pages fetched at once
+
+    Returns:
+        list: All matching rows as dicts, in order_by order
+    """
+    order_columns = [order_by] if isinstance(order_by, str) else list(order_by)
+
+    def page(start, end, count=None):
+        query = client.table(table).select(columns, count=count)
+        if apply_filters is not None:
+            query = apply_filters(query)
+        for column in order_columns:
+            query = query.order(column)
+        return query.range(start, end).execute()
+
+    first = page(0, page_size - 1, count="exact")
+    rows = list(first.data or [])
+    total = first.count if first.count is not None else len(rows)
+    if not rows or len(rows) >= total:
+        return rows
+
+    # The server may cap pages below page_size, so step by what the first page returned
+    step = len(rows)
+    starts = range(step, total, step)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(starts)))) as executor:
+        pages = executor.map(lambda start: page(start, start + step - 1).data or [], starts)
+        for page_rows in pages:
+            rows.extend(page_rows)
+    return rows
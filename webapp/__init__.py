@@ -6,6 +6,10 @@ def create_app():
     # Import and register your blueprint (routes)
     from webapp.routes import bp as main_bp
     webapp.register_blueprint(main_bp)
+
+    # ETag/304 and gzip/brotli compression for pages and JSON APIs
+    from webapp.http_caching import register_http_caching
+    register_http_caching(webapp)
     # You can add further app configuration here (database, extensions, etc.)
 
     return webapp
\ No newline at end of file
@@ -0,0 +1,119 @@
+""" Response compression and ETag/304 handling for the webapp's pages and JSON APIs.
+
+Every page and API response depends only on the data version (see services/cache.py), the
+deployed code and the request's path and query string. A strong ETag is built from those
+before the view runs, so a matching If-None-Match is answered with 304 without querying or
+rendering anything. Responses are then compressed with brotli or gzip, whichever the
+client prefers; brotli is only offered when the optional `brotli` package is installed.
+"""
+import gzip
+import hashlib
+import os
+from flask import g, request, make_response
+from webapp.services.cache import result_cache
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+FINGERPRINT_SUFFIXES = (".py", ".html", ".js", ".css")   # Files whose changes alter responses
+
+
+def source_fingerprint(root=os.path.dirname(os.path.abspath(__file__))):
+    """
+    Hash the webapp's code, templates and static files, in a fixed order so every worker
+    of a deploy gets the same value
+
+    Args:
+        root: Folder to hash, the webapp package by default
+
+    Returns:
+        str: Hex digest of the relative paths and contents of the files
+    """
+    digest = hashlib.sha256()
+    for folder, subfolders, files in os.walk(root):
+        subfolders[:] = sorted(name for name in subfolders if name != "__pycache__")
+        for name in sorted(files):
+            if not name.endswith(FINGERPRINT_SUFFIXES):
+                continue
+            path = os.path.join(folder, name)
+            digest.update(os.path.relpath(path, root).replace(os.sep, "/").encode())
+            with open(path, "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+# Changes on every deploy so ETags from older templates are not reused, the same in every worker
+BUILD_ID = os.getenv("WEBAPP_BUILD_ID") or os.getenv("RENDER_GIT_COMMIT") or source_fingerprint()
+MIN_COMPRESS_BYTES = 500    # Smaller responses are sent as they are
+COMPRESSIBLE_TYPES = {"text/html", "text/css", "text/plain", "application/json", "application/javascript"}
+CACHED_ENDPOINTS = {"main.index", "main.war_table", "main.progress_graphs", "main.get_graph_data", "main.war_table_api"}
+
+
+def choose_encoding():
+    """Pick the content encoding for this request: "br", "gzip" or None."""
+    accepted = request.accept_encodings
+    options = [("br", accepted["br"]) if brotli is not None else ("br", 0), ("gzip", accepted["gzip"])]
+    encoding, quality = max(options, key=lambda option: option[1])
+    return encoding if quality > 0 else None
+
+
+def build_etag(encoding):
+    """
+    Build the strong ETag of the current request's response before it is rendered
+
+    Args:
+        encoding: Content encoding the response will use, part of the tag because the bytes differ
+
+    Returns:
+        str: Hex digest of the data version, build, path, query string and encoding
+    """
+    parts = [str(result_cache.data_version()), BUILD_ID, request.path,
+             request.query_string.decode("latin-1"), encoding or "identity"]
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()[:32]
+
+
+def compress(data, encoding):
+    if encoding == "br":
+        return brotli.compress(data, quality=5)
+    return gzip.compress(data, compresslevel=6)
+
+
+def register_http_caching(app):
+    """Add ETag/304 handling and compression to the app's page and API endpoints."""
+
+    @app.before_request
+    def answer_not_modified():
+        if request.method != "GET" or request.endpoint not in CACHED_ENDPOINTS:
+            return None
+        g.response_encoding = choose_encoding()
+        g.response_etag = build_etag(g.response_encoding)
+        if g.response_etag in request.if_none_match:
+            response = make_response("", 304)
+            response.set_etag(g.response_etag)
+            response.headers["Cache-Control"] = "no-cache"
+            response.vary.add("Accept-Encoding")
+            return response
+        return None
+
+    @app.after_request
+    def compress_response(response):
+        etag = g.get("response_etag")
+        if etag is None or response.status_code != 200:
+            return response
+        # Browsers may keep the page but must check the ETag before using it
+        response.headers["Cache-Control"] = "no-cache"
+        response.vary.add("Accept-Encoding")
+        response.set_etag(etag)
+
+        encoding = g.response_encoding
+        if (encoding is None or response.direct_passthrough or response.is_streamed
+                or response.mimetype not in COMPRESSIBLE_TYPES or "Content-Encoding" in response.headers):
+            return response
+        data = response.get_data()
+        if len(data) < MIN_COMPRESS_BYTES:
+            return response
+        response.set_data(compress(data, encoding))
+        response.headers["Content-Encoding"] = encoding
+        return response
@@ -1,4 +1,4 @@
-from flask import Blueprint, render_template, request, jsonify
+from flask import Blueprint, render_template, request, jsonify, url_for
 import webapp.services.index_data as ID
 import webapp.services.process_data as PD
 # from webapp.services.Find_battletags import get_war_tags, wars_with_clan, Update_Supabase_battle_tags
@@ -6,6 +6,7 @@ import webapp.services.full_table as full_table
 # from webapp.services.reading_WarData import WarDataManager, get_war_stats
 import webapp.services.graphs as graphs
 import pandas as pd
+import json
 
 
 bp = Blueprint('main', __name__)
@@ -37,11 +38,10 @@ def index():
     recent_colunmns = list(recent_data.columns)
     all_time_columns = list(all_time_data.columns)
 
-    # Convert DataFrames to JSON-compatible format
-    recent_data = PD.Pandas_to_Json(recent_data)
-    all_time_data = PD.Pandas_to_Json(all_time_data)
-    assert isinstance(recent_data, str)
-    assert isinstance(all_time_data, str)
+    # Encode each table once, it is embedded in a <script type="application/json"> block
+    recent_rows, all_time_rows = len(recent_data), len(all_time_data)
+    recent_data = PD.json_script_safe(PD.Pandas_to_Json(recent_data))
+    all_time_data = PD.json_script_safe(PD.Pandas_to_Json(all_time_data))
 
     # Render the template with translated and reordered column names
     return render_template(
@@ -49,9 +49,11 @@ def index():
         filters=filters,
         recent_stats=recent_data,
         all_time_stats=all_time_data,
+        recent_rows=recent_rows,
+        all_time_rows=all_time_rows,
         recent_columns=recent_colunmns,
         all_time_columns=all_time_columns,
-        all_players=ID.get_all_players(),
+        all_players=filters["all_players"],
     )
 
 @bp.route('/coming-soon', methods=['GET'])
@@ -64,43 +66,57 @@ def war_table():
     # Handle multiple players from multi-select dropdown
     selected_players = request.args.getlist("player")  # Get list of selected players
     season_filter = request.args.getlist("season")  # Get the "season" query parameter, if provided
-    
-    # Convert list to single value for backward compatibility with existing functions
-    if len(selected_players) == 1:
-        player_filter = selected_players[0]
-    elif len(selected_players) > 1:
-        player_filter = selected_players
-    else:
-        player_filter = None
-
-    war_data = full_table.get_full_table_data(season_filter, player_filter)
-    assert isinstance(war_data, pd.DataFrame)
-    war_data = PD.replace_nan(PD.translate_columns(PD.reorder_columns(war_data)))
-    assert isinstance(war_data, pd.DataFrame)
-    columns = list(war_data.columns)
-
-    # Convert to JSON-compatible format
-    war_data_JSON = PD.Pandas_to_Json(war_data)
-    
-    # Debug logging
-    print(f"🔍 War table debug:")
-    print(f"  - War data type: {type(war_data)}")
-    print(f"  - War data length: {len(war_data_JSON)}")
-    print(f"  - Columns: {columns}")
-    
+
+    # Rows are loaded a page at a time from /api/war-table, the page only needs the columns
+    column_keys = list(PD.reorder_columns(pd.DataFrame(columns=full_table.TABLE_COLUMNS)).columns)
+    columns = [PD.COLUMN_TRANSLATIONS.get(key, key) for key in column_keys]
+
     # Get all available options for dropdowns
     all_players = ID.get_all_players()
     all_seasons = ID.get_all_seasons()
 
     return render_template("war_data.html",
-        war_data=war_data_JSON,
         columns=columns,
+        column_keys=column_keys,
+        data_url=url_for("main.war_table_api", player=selected_players, season=season_filter),
         all_players=all_players,
         all_seasons=all_seasons,
         selected_players=selected_players,
         selected_season=season_filter
     )
 
+@bp.route('/api/war-table', methods=['GET'])
+def war_table_api():
+    """API endpoint returning one page of the war table, sorted and filtered in the database.
+
+    ARGS:
+        player (list): Player names to include, all players if not given.
+        season (list): Seasons to include, all seasons if not given.
+        sort (str): Column to sort on. Default is "name".
+        direction (str): "asc" or "desc". Default is "asc".
+        cursor (str): next_cursor from the previous page, omitted for the first page.
+        limit (int): Rows per page.
+    """
+    try:
+        page = full_table.get_war_table_page(
+            season_filter=request.args.getlist("season"),
+            player_filter=request.args.getlist("player"),
+            sort_column=request.args.get("sort", "name"),
+            descending=request.args.get("direction", "asc") == "desc",
+            cursor=request.args.get("cursor"),
+            page_size=request.args.get("limit", full_table.WAR_TABLE_PAGE_SIZE, type=int),
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Key rows by the displayed column names, like the rest of the tables
+    rows = [{PD.COLUMN_TRANSLATIONS.get(key, key): value for key, value in row.items()} for row in page["rows"]]
+    return jsonify({
+        "rows": rows,
+        "next_cursor": page["next_cursor"],
+        "total": page["total"],
+    })
+
 @bp.route('/progress-graphs', methods=['GET'])
 def progress_graphs():
 
@@ -126,10 +142,9 @@ def progress_graphs():
     # prepare Chart.js data for the first y variable (or loop if multiple)
     chartjs_data = graphs.prepare_chartjs_data(grouped_data, y_variable=y_vars[0], x_variable="season")
     
-    # Convert to JSON-compatible format
-    # chartjs_data =  PD.Pandas_to_Json(chartjs_data)
-    
-    # pass the prepared structure to the template; use Jinja's tojson in template
+    # Embed the initial chart once so graphs.js can draw it without calling the API
+    chartjs_data = PD.json_script_safe(json.dumps(chartjs_data, ensure_ascii=False))
+
     return render_template("graphs.html",
                            chartjs_data=chartjs_data,
                            x_label="season",
@@ -140,37 +155,44 @@ def progress_graphs():
 @bp.route('/api/graph-data', methods=['GET'])
 def get_graph_data():
     """API endpoint to fetch graph data based on query parameters.
+
+    Several stats and X axes can be requested at once. All of them are averaged from one
+    fetch with one groupby per X axis, so the page can switch between them locally.
     
     ARGS:
-        y_vars (list): List of Y variable names to plot.
-        x_variable (str): X variable name.
-        player_filter (list): List of player names to filter data.
+        stat (list): Y variable names to plot. Default is ["attack_stars"].
+        x (list): X variable names, "season" and/or "battleday". Default is ["season"].
+        selected_players (list): List of player names to filter data.
+
+    Returns:
+        JSON: Chart.js data for the first stat and X axis (labels, datasets, yLabel, xLabel),
+            plus "charts" holding the data for every requested X axis and stat.
     """
     # Get parameters
     selected_players = request.args.getlist("selected_players")  # List of player names
-    selected_stat = request.args.get("stat", "attack_stars")  # Y variable
+    selected_stats = request.args.getlist("stat") or ["attack_stars"]  # Y variables
+    x_variables = request.args.getlist("x") or ["season"]  # X variables
 
     print(f"📊 API Request Received:")
     print(f"  - Players: {selected_players}")
-    print(f"  - Stat: {selected_stat}")
+    print(f"  - Stats: {selected_stats}")
+    print(f"  - X axes: {x_variables}")
 
     try:
-        # Fetch and prepare graph data
-        grouped_data, labels = graphs.fetch_graph_data(
-            y_variables=[selected_stat],
-            x_variable="season",
+        # Fetch, group and prepare Chart.js data for every stat and X axis together
+        batch = graphs.prepare_chartjs_batch(
+            y_variables=list(dict.fromkeys(selected_stats)),
+            x_variables=list(dict.fromkeys(x_variables)),
             player_filter=selected_players if selected_players else None
         )
 
-        # Prepare Chart.js data
-        chartjs_data = graphs.prepare_chartjs_data(
-            grouped_data,
-            y_variable=selected_stat,
-            x_variable="season"
-        )
-
+        # The first chart is also returned at the top level for single-stat callers
+        chartjs_data = dict(batch["charts"][x_variables[0]][selected_stats[0]])
+        chartjs_data["charts"] = batch["charts"]
         return jsonify(chartjs_data)
-    
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         print(f"❌ Error in API: {e}")
         import traceback
@@ -0,0 +1,127 @@
+""" Shared result cache for the webapp services.
+
+The war data only changes when the refresh job runs, so service results are kept in a
+size-bounded LRU cache keyed by function and filters. Every entry is tagged with the data
+version (the latest `war_status.last_updated`) it was built from and is dropped once the
+version moves on. The version itself is checked at most once every `version_ttl` seconds,
+so warm requests don't touch Supabase at all.
+
+Cached results are shared between requests, so callers must not modify them in place.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from webapp.supabase_client import supabase
+
+CACHE_SIZE = int(os.getenv("WEBAPP_CACHE_SIZE", 128))             # Maximum cached results
+VERSION_TTL = float(os.getenv("WEBAPP_CACHE_VERSION_TTL", 30))    # Seconds between data version checks
+
+
+def fetch_data_version():
+    """
+    Fetch the current data version: the time the refresh job last saved a war.
+
+    Returns:
+        str or None: Latest `war_status.last_updated`, None if no war has been saved
+    """
+    response = (supabase.table("war_status").select("last_updated")
+                .order("last_updated", desc=True, nullsfirst=False).limit(1).execute())
+    return response.data[0]["last_updated"] if response.data else None
+
+
+def _freeze(value):
+    """Turn lists, sets and dicts in arguments into hashable equivalents for cache keys."""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    return value
+
+
+class ResultCache:
+    def __init__(self, max_entries=CACHE_SIZE, version_ttl=VERSION_TTL, version_source=fetch_data_version):
+        """
+        Initialize the result cache
+
+        Args:
+            max_entries: Maximum number of results kept, least recently used are evicted first
+            version_ttl: Seconds a data version check is trusted for
+            version_source: Function returning the current data version
+        """
+        self.max_entries = max_entries
+        self.version_ttl = version_ttl
+        self.version_source = version_source
+        self.entries = OrderedDict()  # key -> (data version, result)
+        self.version = None
+        self.version_checked_at = None
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def data_version(self):
+        """Return the current data version, asking Supabase only when the last check has expired."""
+        with self.lock:
+            now = time.monotonic()
+            if self.version_checked_at is not None and now - self.version_checked_at < self.version_ttl:
+                return self.version
+        version = self.version_source()
+        with self.lock:
+            if version != self.version:
+                # The refresh job has written new data since the entries were built
+                self.entries.clear()
+            self.version = version
+            self.version_checked_at = time.monotonic()
+        return version
+
+    def get_or_compute(self, key, compute):
+        """
+        Return the cached result for key, computing and storing it on a miss
+
+        Args:
+            key: Hashable cache key
+            compute: Function called without arguments to build the result
+
+        Returns:
+            The cached or freshly computed result. Exceptions are raised and not cached.
+        """
+        version = self.data_version()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] == version:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        result = compute()
+        with self.lock:
+            self.entries[key] = (version, result)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return result
+
+    def clear(self):
+        """Drop every entry and force a data version check on the next request."""
+        with self.lock:
+            self.entries.clear()
+            self.version_checked_at = None
+
+    def __len__(self):
+        return len(self.entries)
+
+
+result_cache = ResultCache()
+
+
+def cached(function):
+    """Decorator caching a service function's result in `result_cache`, keyed by its arguments."""
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        key = (function.__module__, function.__qualname__, _freeze(args), _freeze(kwargs))
+        return result_cache.get_or_compute(key, lambda: function(*args, **kwargs))
+    return wrapper
@@ -1,32 +1,132 @@
-from webapp.supabase_client import supabase
+from webapp.supabase_client import supabase, WAR_DATA_ORDER
+from webapp.services.cache import cached
+import base64
+import json
 import pandas as pd
 
-def get_full_table_data(season_filter=None, player_filter=None):
-    
-    query = supabase.table("war_data").select("*")
-    if player_filter:
-        query = query.eq("name", player_filter)
-    if season_filter:
-        query = query.eq("season", season_filter)
-    
-    # Execute the query and fetch data
-    result = query.execute()
-    # Process the data into structured format
-    if "error" in result:
-        return {"error": result["error"]}  # Return error if query fails
-    
-    data = pd.DataFrame(result.data)
-
-    # Important columns to display in tables
-    important_columns = ["name", "attack_th_diff", "defense_th_diff", "attack_stars", "attack_percentage", "defense_stars", "defense_percentage", "season", "battleday","attack_duration", "defense_duration", "townhallLevel", "mapPosition"]
-
-    # Filter data to only include important columns
-    filtered_data = data[important_columns] if not data.empty else pd.DataFrame(columns=important_columns)
-
-    return filtered_data
+# Important columns to display in tables
+TABLE_COLUMNS = ["name", "attack_th_diff", "defense_th_diff", "attack_stars", "attack_percentage", "defense_stars", "defense_percentage", "season", "battleday","attack_duration", "defense_duration", "townhallLevel", "mapPosition"]
+WAR_TABLE_PAGE_SIZE = 100   # Rows per page of /api/war-table
+MAX_PAGE_SIZE = 500
+
+def as_list(value):
+    """Turn a single filter value into a list, leaving lists alone and None/empty as an empty list."""
+    if value is None or value == "":
+        return []
+    if isinstance(value, (list, tuple, set)):
+        return [item for item in value if item not in (None, "")]
+    return [value]
+
+def apply_table_filters(query, season_filter=None, player_filter=None):
+    """Filter a war_data query to the given seasons and players, each a single value or a list."""
+    players = as_list(player_filter)
+    seasons = as_list(season_filter)
+    if players:
+        query = query.in_("name", players)
+    if seasons:
+        query = query.in_("season", seasons)
+    return query
+
+def encode_cursor(row, sort_column):
+    """Encode the sort key of the last row on a page as an opaque cursor string."""
+    key = [row.get(sort_column)] + [row.get(column) for column in WAR_DATA_ORDER]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+def decode_cursor(cursor):
+    """Decode a cursor from encode_cursor back into [sort value, wartag, tag]."""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+    if not isinstance(key, list) or len(key) != 1 + len(WAR_DATA_ORDER):
+        raise ValueError("Invalid cursor")
+    return key
+
+def _filter_value(value):
+    """Format a value for a PostgREST logic filter, quoting strings so commas and brackets are safe."""
+    if isinstance(value, str):
+        return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+    return json.dumps(value)
+
+def keyset_filter(sort_column, descending, cursor_key):
+    """
+    Build the PostgREST `or` filter selecting the rows after a cursor.
+
+    Rows are ordered by the sort column (nulls last) and then by WAR_DATA_ORDER, the unique
+    key, ascending. The rows after (value, wartag, tag) are those further along the sort
+    column, or level on it and further along the unique key.
+
+    Args:
+        sort_column (str): Column the page is sorted on.
+        descending (bool): Whether the sort column is descending.
+        cursor_key (list): [sort value, wartag, tag] of the last row already shown.
+
+    Returns:
+        str: Filter for query.or_()
+    """
+    value, *tiebreak = cursor_key
+    after_tiebreak = []
+    for i, column in enumerate(WAR_DATA_ORDER):
+        level = [f"{WAR_DATA_ORDER[j]}.eq.{_filter_value(tiebreak[j])}" for j in range(i)]
+        after_tiebreak.append(level + [f"{column}.gt.{_filter_value(tiebreak[i])}"])
+
+    if value is None:
+        # Nulls sort last, so only the remaining null rows can follow
+        conditions = [f"and({sort_column}.is.null,{','.join(level)})" for level in after_tiebreak]
+    else:
+        operator = "lt" if descending else "gt"
+        conditions = [f"{sort_column}.{operator}.{_filter_value(value)}", f"{sort_column}.is.null"]
+        conditions += [f"and({sort_column}.eq.{_filter_value(value)},{','.join(level)})" for level in after_tiebreak]
+    return ",".join(conditions)
+
+@cached
+def get_war_table_page(season_filter=None, player_filter=None, sort_column="name", descending=False,
+                       cursor=None, page_size=WAR_TABLE_PAGE_SIZE):
+    """
+    Fetch one page of the war table, sorted and filtered in the database, using keyset pagination.
+
+    Args:
+        season_filter (str or list, optional): Seasons to include.
+        player_filter (str or list, optional): Player names to include.
+        sort_column (str): Column in TABLE_COLUMNS to sort on.
+        descending (bool): Sort the column descending.
+        cursor (str, optional): next_cursor of the previous page, None for the first page.
+        page_size (int): Rows per page, at most MAX_PAGE_SIZE.
+
+    Returns:
+        dict: rows (list of dicts with TABLE_COLUMNS), next_cursor (str or None when this is
+            the last page) and total (matching row count, first page only).
+    """
+    if sort_column not in TABLE_COLUMNS:
+        raise ValueError(f"Cannot sort by '{sort_column}'")
+    page_size = max(1, min(int(page_size), MAX_PAGE_SIZE))
+
+    # Select the tiebreak columns too so the next cursor can be built
+    columns = list(dict.fromkeys(TABLE_COLUMNS + WAR_DATA_ORDER))
+    first_page = cursor is None
+    query = supabase.table("war_data").select(",".join(columns), count="exact" if first_page else None)
+    query = apply_table_filters(query, season_filter, player_filter)
+    if not first_page:
+        query = query.or_(keyset_filter(sort_column, descending, decode_cursor(cursor)))
+    query = query.order(sort_column, desc=descending, nullsfirst=False)
+    for column in WAR_DATA_ORDER:
+        query = query.order(column)
+
+    # One extra row tells whether there is another page
+    result = query.limit(page_size + 1).execute()
+    rows = result.data or []
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+
+    return {
+        "rows": [{column: row.get(column) for column in TABLE_COLUMNS} for row in rows],
+        "next_cursor": encode_cursor(rows[-1], sort_column) if has_more else None,
+        "total": result.count if first_page else None,
+    }
 
 if __name__ == "__main__":
     # Example usage
-    df = get_full_table_data(season_filter="2025-11", player_filter="rozzledog 72")
-    print(df.head())
+    page = get_war_table_page(season_filter="2025-11", player_filter="rozzledog 72", page_size=5)
+    print(f"{page['total']} rows, next cursor: {page['next_cursor']}")
+    print(pd.DataFrame(page["rows"]))
 
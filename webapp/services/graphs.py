@@ -1,9 +1,93 @@
 """ This module handles graph-related functionalities. Pulling data from Supabase and preparing it for graphing in `graphs.html`. 
 """
-from webapp.supabase_client import supabase
+from webapp.supabase_client import supabase, WAR_DATA_ORDER
+from supabase_paging import fetch_all_rows
+from webapp.services.cache import cached
 import pandas as pd
+import numpy as np
 from webapp.services.process_data import replace_nan, COLUMN_TRANSLATIONS
 
+# Columns the progress graphs can use as their X axis
+GRAPH_X_VARIABLES = ["season", "battleday"]
+# Stats summed and counted per player and season in player_season_stats (sql/004_player_season_stats.sql)
+ROLLUP_COLUMNS = ["townhallLevel", "mapPosition", "attacker_townhallLevel", "defender_townhallLevel",
+                  "attack_th_diff", "defense_th_diff", "attack_stars", "attack_percentage", "attack_duration",
+                  "defense_stars", "defense_percentage", "defense_duration"]
+ROLLUP_ORDER = ["season", "tag"]    # Primary key of player_season_stats, a stable order for paging
+
+def fetch_season_means(y_variables, player_filter=None):
+    """
+    Averages Y variables per player and season from the player_season_stats rollup, whose size
+    depends on players and seasons rather than on the number of attacks.
+
+    Args:
+        y_variables (list): Y-axis variables to average, from ROLLUP_COLUMNS.
+        player_filter (array or list): Filter data for specific players. Defaults to None.
+
+    Returns:
+        DataFrame: season, name and the mean of every Y variable, sorted by season and name.
+    """
+    columns = ["season", "name"] + [f"{y}_{part}" for y in y_variables for part in ("sum", "count")]
+    apply_filters = (lambda query: query.in_("name", player_filter)) if player_filter else None
+    rows = fetch_all_rows(supabase, "player_season_stats", ",".join(columns), apply_filters, order_by=ROLLUP_ORDER)
+    if len(rows)==0:
+        raise Exception(f"Error fetching data: no rows for players {player_filter}, double check the filters")
+
+    # A player's rows for a season are added up first, names can be shared across tags
+    totals = pd.DataFrame(rows, columns=columns)
+    totals[columns[2:]] = totals[columns[2:]].apply(pd.to_numeric, errors="coerce")
+    totals = totals.groupby(["season", "name"])[columns[2:]].sum().reset_index()
+    for y in y_variables:
+        totals[y] = totals[f"{y}_sum"] / totals[f"{y}_count"].where(totals[f"{y}_count"] > 0)
+    return totals[["season", "name"] + y_variables].sort_values(by=["season", "name"]).reset_index(drop=True)
+
+@cached
+def fetch_grouped_stats(y_variables, x_variables=("season",), player_filter=None):
+    """
+    Fetches the plotted columns once and averages every Y variable per player for each X variable.
+    Season-only requests for rollup stats are read from player_season_stats, other X
+    variables need the raw war_data rows.
+
+    Args:
+        y_variables (list): Y-axis variables to average.
+        x_variables (list): X-axis variables to group by, from GRAPH_X_VARIABLES.
+        player_filter (array or list): Filter data for specific players. Defaults to None.
+
+    Returns:
+        dict: X variable -> DataFrame of x, name and the mean of every Y variable, sorted by x and name.
+    """
+    y_variables, x_variables = list(y_variables), list(x_variables)
+    if not y_variables or not x_variables:
+        raise ValueError(f"Invalid x_variable or y_variables")
+
+    # Only request the columns being plotted
+    columns = list(dict.fromkeys(["name"] + x_variables + y_variables))
+    if not all(column in COLUMN_TRANSLATIONS for column in columns) or not all(x in GRAPH_X_VARIABLES for x in x_variables):
+        raise ValueError(f"Invalid x_variable or y_variables")
+
+    # war_data is scanned anyway for other X variables, so the season means come from it too
+    if x_variables == ["season"] and all(y in ROLLUP_COLUMNS for y in y_variables):
+        return {"season": fetch_season_means(y_variables, player_filter)}
+
+    # Define the filters for Supabase query
+    apply_filters = (lambda query: query.in_("name", player_filter)) if player_filter else None
+
+    # Fetch every matching row, paging past PostgREST's max rows
+    rows = fetch_all_rows(supabase, "war_data", ",".join(columns), apply_filters, order_by=WAR_DATA_ORDER)
+
+    if len(rows)==0:
+        raise Exception(f"Error fetching data: no rows for players {player_filter}, double check the filters")  # Raise error if query fails
+    
+    data = pd.DataFrame(rows, columns=columns)
+    data[y_variables] = data[y_variables].apply(pd.to_numeric, errors="coerce")
+
+    # One groupby per X variable averages all the Y variables together
+    grouped = {}
+    for x_variable in x_variables:
+        grouped_data = data.groupby([x_variable, "name"])[y_variables].mean().reset_index()
+        grouped[x_variable] = grouped_data.sort_values(by=[x_variable, "name"]).reset_index(drop=True)
+    return grouped
+
 def fetch_graph_data(y_variables, x_variable="season", player_filter=None):
     """
     Fetches data from Supabase and prepares it for graphing.
@@ -16,31 +100,8 @@ def fetch_graph_data(y_variables, x_variable="season", player_filter=None):
     Returns:
         dict: A dictionary containing the processed data for graphing.
     """        
-    
-    # Define the filters for Supabase query
-    query = supabase.table("war_data").select("*")
-    
-    query = query.in_("name", player_filter) if player_filter else query
-        
-
-    # Execute the query and fetch data
-    result = query.execute()
-
-    if len(result.data)==0:
-        raise Exception(f"Error fetching data: {result}, double check the filters")  # Raise error if query fails
-    
-    data = pd.DataFrame(result.data)
-    
-    # Ensure x_variable and y_variables are in the DataFrame
-    if x_variable not in data.columns or not all(var in data.columns for var in y_variables):
-        # print(data.columns)
-        raise  ValueError(f"Invalid x_variable or y_variables")
+    grouped_data = fetch_grouped_stats(y_variables, [x_variable], player_filter)[x_variable]
 
-    # Data for each player grouped by the x_variable
-    grouped_data = data.groupby([x_variable] + ["name"])[y_variables].mean().reset_index()
-    grouped_data = grouped_data.sort_values(by=[x_variable, "name"])
-
-    y_labels = {var: grouped_data[var].tolist() for var in y_variables} 
     # Nan handling: replace NaN with None for JSON compatibility
     grouped_data = replace_nan(grouped_data)
 
@@ -52,6 +113,47 @@ def fetch_graph_data(y_variables, x_variable="season", player_filter=None):
     
     return grouped_data, labels
 
+def prepare_chartjs_batch(y_variables, x_variables=("season",), player_filter=None):
+    """
+    Prepares Chart.js data for several Y variables and X variables from one fetch and one
+    groupby per X variable, so the graph page can switch between them without another request.
+
+    Args:
+        y_variables (list): Y-axis variables to plot.
+        x_variables (list): X-axis variables to plot, from GRAPH_X_VARIABLES.
+        player_filter (array or list): Filter data for specific players. Defaults to None.
+
+    Returns:
+        dict: {"charts": {x_variable: {y_variable: Chart.js data}}}
+    """
+    grouped = fetch_grouped_stats(y_variables, x_variables, player_filter)
+    charts = {
+        x_variable: {y_variable: prepare_chartjs_data(grouped_data, y_variable, x_variable)
+                     for y_variable in y_variables}
+        for x_variable, grouped_data in grouped.items()
+    }
+    return {"charts": charts}
+
+def round_significant(values, digits):
+    """
+    Round every value in an array to a number of significant figures, exactly like float(f"{value:.3g}").
+
+    Formatting is used rather than np.round on a scaled value, which rounds half-way decimals
+    such as 72.45 and 5.395 differently from the string formatting the graphs always used.
+
+    Args:
+        values (np.ndarray): Float array, NaN is left as NaN.
+        digits (int): Significant figures to keep.
+
+    Returns:
+        np.ndarray: Rounded array of the same shape.
+    """
+    values = np.asarray(values, dtype=float)
+    rounded = np.full(values.shape, np.nan)
+    finite = np.isfinite(values)
+    rounded[finite] = [float(f"{value:.{digits}g}") for value in values[finite].tolist()]
+    return rounded
+
 def prepare_chartjs_data(grouped_data, y_variable, x_variable = "season", colours = None):
     """
     Prepares data in a format suitable for Chart.js.
@@ -73,11 +175,21 @@ def prepare_chartjs_data(grouped_data, y_variable, x_variable = "season", colour
         raise ValueError("grouped_data is empty")
 
     # Get unique x labels
-    x_labels = sorted(grouped_data[x_variable].unique())
+    x_labels = sorted(grouped_data[x_variable].unique().tolist())
     print("Step 1 - X Labels:", x_labels)
     # Unique player names
     player_names = grouped_data["name"].unique()
     print("Step 2 - Players:", player_names)
+
+    # Players x x-labels matrix of values in one pivot, rounded to 3 significant figures
+    values = grouped_data.drop_duplicates(["name", x_variable], keep="last").pivot(
+        index="name", columns=x_variable, values=y_variable)
+    values = values.reindex(index=player_names, columns=x_labels).apply(pd.to_numeric, errors="coerce")
+    matrix = round_significant(values.to_numpy(dtype=float), 3)
+    # Missing values become None (null in JSON) so Chart.js leaves a gap
+    data_rows = matrix.astype(object)
+    data_rows[~np.isfinite(matrix)] = None
+    data_rows = data_rows.tolist()
     
     # Colour pallette for multiple lines
     if colours is None:
@@ -96,24 +208,7 @@ def prepare_chartjs_data(grouped_data, y_variable, x_variable = "season", colour
     markers = ['circle','star','cross','triangle', 'rect',  'diamond', 'plus', 'heart']
     
     datasets = []
-    for i, player in enumerate(player_names):
-        # Fileter data for current player
-        player_data = replace_nan(grouped_data[grouped_data["name"]==player])
-
-        # access data into dictionary form
-        season_value_map = dict(zip(player_data["season"], player_data[y_variable]))        # in form {"seaon": y_value,...}
-
-        # Handle missing data and aligning with x_labels
-        data_values = []
-        for ind,season in enumerate(x_labels):
-            value = season_value_map.get(season,None)
-            if value is None:
-                data_values.append(None)
-            else:
-                try:
-                    data_values.append(float("{:.3g}".format(float(value))))
-                except (ValueError, TypeError):
-                    data_values.append(None)
+    for i, (player, data_values) in enumerate(zip(player_names, data_rows)):
 
         # Cycle through colours; when we wrap to a new colour-set (cycle), change markers.
         cycle = i // len(colours)
@@ -142,7 +237,8 @@ def prepare_chartjs_data(grouped_data, y_variable, x_variable = "season", colour
     chartjs_data = {
         "labels": x_labels,
         "datasets": datasets,
-        "yLabel": COLUMN_TRANSLATIONS.get(y_variable, y_variable)  # Translate y_variable for axis label
+        "yLabel": COLUMN_TRANSLATIONS.get(y_variable, y_variable),  # Translate y_variable for axis label
+        "xLabel": COLUMN_TRANSLATIONS.get(x_variable, x_variable)
     }
     return chartjs_data
             
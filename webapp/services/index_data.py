@@ -1,68 +1,69 @@
 from webapp.supabase_client import supabase
+from webapp.services.cache import cached
 import pandas as pd
 
+# Important columns to display in tables
+STAT_COLUMNS = ["attack_th_diff", "defense_th_diff", "attack_stars", "attack_percentage", "defense_stars", "defense_percentage"]
+
+@cached
+def fetch_player_averages():
+    """
+    Fetch every player's averages for the most recent season and all time in one round trip,
+    using the `player_averages` database function, which reads the player_season_stats rollup
+    (sql/004_player_season_stats.sql).
+
+    Returns:
+        pd.DataFrame: scope ("recent" or "all_time"), season (recent rows only), name and STAT_COLUMNS.
+    """
+    try:
+        result = supabase.rpc("player_averages", {"player_name": None}).execute()
+    except Exception as e:
+        raise ValueError("error", f"Error fetching data: {e}")  # Return error if query fails
+    print(f"Fetched averages for {len(result.data or [])} player rows from the database.")
+
+    averages = pd.DataFrame(result.data or [], columns=["scope", "season", "name"] + STAT_COLUMNS)
+    averages[STAT_COLUMNS] = averages[STAT_COLUMNS].apply(pd.to_numeric)
+    return averages
+
+@cached
 def get_index_data(player_filter=None):
     """ Get the data for the index page, including recent war stats and all-time stats.
+
+    Everything the page needs comes from one fetch_player_averages round trip: the recent
+    season, the player list for the dropdown and both average tables are derived from it,
+    splitting the rows by scope in a single grouped pass.
+
     Args:
         
         player_filter (str, optional): Player name to filter data by.
         
     Returns:
-        dict: A dictionary containing recent_stats, all_time_stats, and filters."""
-    # Fetch recent war stats & all-time stats from Supabase
-    # Define the filters for Supabase query
-    query = supabase.table("war_data").select("*")
+        dict: A dictionary containing recent_stats, all_time_stats, and filters. filters holds
+            the players shown, the selected player, every player (all_players) and recent_season."""
+    averages = fetch_player_averages()
+    all_players = sorted(averages.loc[averages["scope"] == "all_time", "name"])
     if player_filter:
-        query = query.eq("name", player_filter)
+        averages = averages[averages["name"] == player_filter]
+    if averages.empty:
+        raise ValueError("error", "No data found for the given filters.")
 
-    # Execute the query and fetch data
-    try:
-        result = query.execute()
-    except Exception as e:
-        raise ValueError("error", f"Error fetching data: {e}")  # Return error if query fails
+    tables = {scope: rows[["name"] + STAT_COLUMNS].sort_values("name").reset_index(drop=True)
+              for scope, rows in averages.groupby("scope")}
+    empty = pd.DataFrame(columns=["name"] + STAT_COLUMNS)
+    recent_stats = tables.get("recent", empty)
+    all_time_stats = tables.get("all_time", empty)
+
+    recent_seasons = averages.loc[averages["scope"] == "recent", "season"]
+    recent_season = recent_seasons.iloc[0] if not recent_seasons.empty else None
+    if recent_stats.empty:
+        print(f"No recent data found for the most recent season and given player filter: {player_filter}")
 
-    data_exists = result.data and len(result.data) > 0
-    if data_exists:
-        lengthData = len(result.data)
-    if not data_exists:
-        raise ValueError("error", "No data found for the given filters.")
-    
-    print(f"Fetched {len(result.data)} records from the database.")
-
-    # Process the data into structured format
-    if "error" in result:
-        raise ValueError("error", f"Error fetching data: {result['error']}")  # Return error if query fails
-    
-    data = pd.DataFrame(result.data)
-    if data_exists:
-        if lengthData != data.shape[0]:
-            raise ValueError("error", "Data length mismatch after conversion to DataFrame.")
-        print(f"Data converted to DataFrame with shape: {data.shape}")
-    
-
-    # Filter for the most recent season's data
-    most_recent_season = find_mostRecent_season()
-    if most_recent_season:
-        recent_data = data[data['season'] == most_recent_season]
-        if recent_data.empty:
-            print(f"No recent data found for season: {most_recent_season} and given player filter: {player_filter}")
-    else:
-        # Empty because if no seasons found for player filter then no recent data
-        recent_data = pd.DataFrame(columns=data.columns)
-    
-    # Important columns to display in tables
-    statCols= ["attack_th_diff", "defense_th_diff", "attack_stars", "attack_percentage", "defense_stars", "defense_percentage"]  
-
-    # Example: Extract recent stats (last battleday) and all-time stats
-    recent_stats = calculate_averages_by_player(recent_data, statCols)
-    all_time_stats = calculate_averages_by_player(data, statCols)
-    seasons = list(data["season"].unique())
-    players = list(data["name"].unique())
-     
     # Define filters for the dropdowns (static or dynamic)
     filters = {
-        "players": players,
-        "selected_player": player_filter if player_filter is not None else "All Players"
+        "players": list(all_time_stats["name"]),
+        "selected_player": player_filter if player_filter is not None else "All Players",
+        "all_players": all_players,
+        "recent_season": recent_season,
     }
 
     if not isinstance(recent_stats, pd.DataFrame) or not isinstance(all_time_stats, pd.DataFrame):
@@ -74,95 +75,47 @@ def get_index_data(player_filter=None):
         "filters": filters
     }
 
-def calculate_averages_by_player(dataset, columns):
-        """
-        Calculate averages for the specified columns in the dataset grouped by player name.
-        Returns a dictionary where each key is the player's name and the value is a dictionary of averaged data.
-
-        Args:
-            dataset (pd.DataFrame): The dataset to process.
-            columns (list): List of columns to calculate averages for.
-
-        Returns:
-            dict: A pandas df with player names as keys and their averaged stats as values.
-        """
-
-        # Check we have data and if so then proceed
-        if isinstance(dataset, pd.DataFrame) and not dataset.empty:
-            # group by name and calculate mean for specified columns
-            grouped_df = dataset.groupby("name")[columns].mean(numeric_only=True).round(2)
-            grouped_df = grouped_df.reset_index() # Reset index to have 'name' as a column
-            
-            return grouped_df
-        else:
-            # Return empty DataFrame with specified columns if no data
-            columns = ["name"] + columns
-            return pd.DataFrame(columns=columns)
-   
-def find_mostRecent_season():
-    response = supabase.table("war_data").select("season").order("season", desc=True).limit(1).execute()
-    if response.data:
-        return response.data[0]['season']
-    return None
+@cached
+def get_filter_options():
+    """
+    Fetch the distinct players and seasons for the filter dropdowns in one round trip,
+    using the `filter_options` database function (sql/003_filter_options.sql)
+
+    Returns:
+        dict: "players" and "seasons", each a sorted list of distinct values
+    """
+    try:
+        response = supabase.rpc("filter_options").execute()
+    except Exception as e:
+        raise ValueError(f"Error fetching filter options: {e}")
+
+    options = {"players": [], "seasons": []}
+    for row in response.data or []:
+        options["players" if row["kind"] == "player" else "seasons"].append(row["value"])
+    return {kind: sorted(values) for kind, values in options.items()}
 
 def get_all_players():
     """
     Fetch all unique player names from the database
     Returns a list of player names
     """    
-    try:
-        response = supabase.table('war_data').select('name').execute()
-        
-        # Extract unique names
-        players = list(set([row['name'] for row in response.data]))
-        return players
-    except Exception as e:
-        raise ValueError(f"Error fetching player names: {e}")
+    return list(get_filter_options()["players"])
 
 def get_all_seasons():
     """
     Fetch all unique seasons from the database
     Returns a list of seasons
     """    
-    try:
-        response = supabase.table('war_data').select('season').execute()
-        
-        # Extract unique seasons
-        seasons = list(set([row['season'] for row in response.data]))
-        return seasons
-    except Exception as e:
-        raise ValueError(f"Error fetching seasons: {e}")
+    return list(get_filter_options()["seasons"])
 
 if __name__ == "__main__":
-    season = find_mostRecent_season()
-    # data = get_index_data(season_filter=season)
-
-    test_data = pd.DataFrame({
-        'name': ['player1', 'player2', 'player1', 'player2'],
-        'attack_th_diff': [1, 2, 3, 4],
-        'defense_th_diff': [2, 3, 4, 5],
-        'attack_stars': [3, 2, 1, 3],
-        'attack_percentage': [95.5, 88.0, 76.5, 100.0],
-        'defense_stars': [1, 2, 3, 0],
-        'defense_percentage': [50.0, 60.0, 70.0, 80.0],
-        'season': ['2025-11', '2025-11', '2025-10', '2025-11'],
-        'poo_stats': [999, 999, 999, 999]
-    })
-    
-    print("Test Data:")
-    print(test_data)
-
-    statCols= ["attack_th_diff", "defense_th_diff", "attack_stars", "attack_percentage", "defense_stars", "defense_percentage"]
-    averages = calculate_averages_by_player(test_data, statCols)
-    print("\nAverages by Player:")
-    print(averages)
+    averages = fetch_player_averages()
+    print("Averages:")
+    print(averages.head())
 
     assert isinstance(averages, pd.DataFrame)
-    assert 'name' in averages.columns
-    assert averages.loc[averages['name']== 'player1', 'attack_th_diff'].values[0] == 2.0
-    assert averages.loc[averages['name']== 'player2', 'defense_percentage'].values[0] == 70.0
-    assert calculate_averages_by_player(pd.DataFrame(), statCols).columns.tolist() == calculate_averages_by_player(test_data, statCols).columns.tolist()
-    # print(f"Recent stats for season {season}: \n{type(data['recent_stats'])} \n{data['recent_stats'][0]}")
+    assert averages.columns.tolist() == ["scope", "season", "name"] + STAT_COLUMNS
+    assert set(averages["scope"]) <= {"recent", "all_time"}
 
     print("Players:", get_all_players())
     print("Seasons:", get_all_seasons())
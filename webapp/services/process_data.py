@@ -1,6 +1,6 @@
 import pandas as pd
 import numpy as np
-import json
+from markupsafe import Markup
 # Universal dictionary for column translations with user-friendly names and emojis
 COLUMN_TRANSLATIONS = {
     "tag": "🏷️ Tag",
@@ -136,17 +136,38 @@ def get_priority_index(stat):
         return 999  # Put unknown stats at the end
 
 def Pandas_to_Json(data):
-    """Convert pandas DataFrame to JSON-compatible format."""
+    """
+    Convert a pandas DataFrame to a JSON array of records in one pass.
+
+    pandas' C encoder writes the frame column by column without building Python dicts,
+    NaN and inf become null.
+
+    Args:
+        data (pandas.DataFrame): Frame to encode.
 
+    Returns:
+        str: JSON array with one object per row.
+    """
     if isinstance(data, pd.DataFrame):
-        data = data.replace([np.inf, -np.inf], None)
-        data = data.where(pd.notna(data), None)
-        data_JSON = data.to_dict(orient='records')
-        if not isinstance(data_JSON, list):
-            raise TypeError(f"Converted data must be a list of dictionaries, got {type(data_JSON).__name__}")
-        return json.dumps(data_JSON)
+        return data.to_json(orient="records", force_ascii=False)
     else:
         raise TypeError(f"Input data must be a pandas DataFrame, got {type(data).__name__}")
+
+def json_script_safe(json_text):
+    """
+    Make JSON text safe to embed once in a `<script type="application/json">` block.
+
+    Escapes the characters that could end the block or start an HTML comment; JSON.parse
+    reads the escapes back as the original characters.
+
+    Args:
+        json_text (str): JSON from Pandas_to_Json or json.dumps.
+
+    Returns:
+        Markup: The JSON, marked safe so Jinja does not escape it again.
+    """
+    escaped = json_text.replace("<", "\\u003c").replace(">", "\\u003e").replace("&", "\\u0026")
+    return Markup(escaped)
     
 def process_data(data, drop_stats=None):
     """Process data by checking type, removing columns, translating and reordering columns.
@@ -161,8 +182,7 @@ def process_data(data, drop_stats=None):
     # Initial type check
     check_Pandas(data, stage="received from backend")
 
-    # Replace NaN values with None
-    data = replace_nan(data)
+    # NaN values are kept, Pandas_to_Json writes them as null
 
     # Remove specified columns if any
     if drop_stats:
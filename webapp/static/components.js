@@ -217,7 +217,12 @@ class FilterableTable extends HTMLElement {
         const title = this.getAttribute('title') || 'Data Table';
         const columnsAttr = this.getAttribute('columns');
         const dataAttr = this.getAttribute('data');
+        // data-source names a <script type="application/json"> block holding the rows
+        const dataSource = this.getAttribute('data-source');
         const filterColumn = this.getAttribute('filter-column') || '0';
+        // With data-url rows are fetched a page at a time, sorted and filtered on the server
+        const dataUrl = this.getAttribute('data-url');
+        const columnKeysAttr = this.getAttribute('column-keys');
 
         console.log(`🔍 FilterableTable Debug (${tableId}):`, {
             columnsAttr,
@@ -239,7 +244,12 @@ class FilterableTable extends HTMLElement {
         // Parse data with error handling
         let data = [];
         try {
-            data = dataAttr ? JSON.parse(dataAttr) : [];
+            if (dataSource) {
+                const sourceElement = document.getElementById(dataSource);
+                data = sourceElement ? JSON.parse(sourceElement.textContent) : [];
+            } else {
+                data = dataAttr ? JSON.parse(dataAttr) : [];
+            }
         } catch (error) {
             console.error(`❌ Error parsing data for ${tableId}:`, error);
             console.error('Data attribute value:', dataAttr ? dataAttr.substring(0, 200) : 'null');
@@ -285,6 +295,12 @@ class FilterableTable extends HTMLElement {
                         `).join('')}
                     </tbody>
                 </table>
+                ${dataUrl ? `
+                <div class="table-pager">
+                    <button type="button" class="filter-button pager-previous" disabled>Previous</button>
+                    <span class="pager-info"></span>
+                    <button type="button" class="filter-button pager-next" disabled>Next</button>
+                </div>` : ''}
             </section>
         `;
 
@@ -297,8 +313,14 @@ class FilterableTable extends HTMLElement {
         this.columns = columns;
         this.currentData = data;  // Initialize current data with original data
 
-        // Setup sorting immediately after table creation
-        this.setupSorting(columns);
+        if (dataUrl) {
+            // Sorting and paging are done by the server
+            const columnKeys = columnKeysAttr ? JSON.parse(columnKeysAttr) : columns;
+            this.setupServerPaging(dataUrl, columnKeys);
+        } else {
+            // Setup sorting immediately after table creation
+            this.setupSorting(columns);
+        }
 
         // Register with filter Manager
         this.setupFiltering();
@@ -330,9 +352,143 @@ class FilterableTable extends HTMLElement {
         }, 5000);
     }
 
+    setupServerPaging(dataUrl, columnKeys) {
+        const url = new URL(dataUrl, window.location.origin);
+        this.serverPath = url.pathname;
+        this.serverFilters = {
+            player: url.searchParams.getAll('player'),
+            season: url.searchParams.getAll('season')
+        };
+        this.columnKeys = columnKeys;
+        this.sortKey = null;
+        this.sortDescending = false;
+        this.cursorStack = [];      // Cursors of the pages before the current one
+        this.currentCursor = null;
+        this.nextCursor = null;
+        this.total = null;
+
+        this.querySelector('.pager-previous').addEventListener('click', () => {
+            if (this.cursorStack.length > 0) {
+                this.loadPage(this.cursorStack.pop());
+            }
+        });
+        this.querySelector('.pager-next').addEventListener('click', () => {
+            if (this.nextCursor) {
+                this.cursorStack.push(this.currentCursor);
+                this.loadPage(this.nextCursor);
+            }
+        });
+
+        const headers = this.querySelectorAll('thead th.sortable');
+        headers.forEach((header, index) => {
+            const button = header.querySelector('.sortable-button');
+            if (!button) return;
+            button.style.cursor = 'pointer';
+            button.addEventListener('click', (e) => {
+                e.preventDefault();
+                const key = this.columnKeys[index];
+                // Same column toggles direction, a new column starts ascending
+                this.sortDescending = this.sortKey === key ? !this.sortDescending : false;
+                this.sortKey = key;
+
+                headers.forEach(h => {
+                    h.classList.remove('active');
+                    const icon = h.querySelector('.sort-icon');
+                    if (icon) icon.textContent = '▾';
+                });
+                header.classList.add('active');
+                const activeIcon = button.querySelector('.sort-icon');
+                if (activeIcon) activeIcon.textContent = this.sortDescending ? '▴' : '▾';
+
+                this.reloadFromFirstPage();
+            });
+        });
+
+        this.reloadFromFirstPage();
+    }
+
+    reloadFromFirstPage() {
+        this.cursorStack = [];
+        this.total = null;
+        this.loadPage(null);
+    }
+
+    buildPageUrl(cursor) {
+        const params = new URLSearchParams();
+        Object.entries(this.serverFilters).forEach(([name, values]) => {
+            values.forEach(value => params.append(name, value));
+        });
+        if (this.sortKey) {
+            params.set('sort', this.sortKey);
+            params.set('direction', this.sortDescending ? 'desc' : 'asc');
+        }
+        if (cursor) {
+            params.set('cursor', cursor);
+        }
+        return `${this.serverPath}?${params.toString()}`;
+    }
+
+    async loadPage(cursor) {
+        const requestUrl = this.buildPageUrl(cursor);
+        this.latestRequest = requestUrl;
+        let page;
+        try {
+            const response = await fetch(requestUrl);
+            page = await response.json();
+            if (!response.ok) {
+                throw new Error(page.error || `HTTP ${response.status}`);
+            }
+        } catch (error) {
+            console.error(`❌ Error loading page for ${this.tableId}:`, error);
+            this.querySelector('tbody').innerHTML = `
+                <tr>
+                    <td colspan="${this.columns.length}" style="text-align: center; color: red;">Error loading data: ${this.escapeHtml(error.message)}</td>
+                </tr>
+            `;
+            return;
+        }
+        // Ignore responses to requests that have since been replaced
+        if (this.latestRequest !== requestUrl) return;
+
+        this.currentCursor = cursor;
+        this.nextCursor = page.next_cursor;
+        if (page.total != null) {
+            this.total = page.total;
+        }
+        this.currentData = page.rows;
+        if (page.rows.length === 0) {
+            this.querySelector('tbody').innerHTML = `
+                <tr>
+                    <td colspan="${this.columns.length}" style="text-align: center; font-style: italic; color: #666;">No data available for selected filters.</td>
+                </tr>
+            `;
+        } else {
+            this._renderTableBody(page.rows);
+        }
+
+        const first = this.cursorStack.length * (this.pageSize || page.rows.length) + 1;
+        this.pageSize = this.pageSize || page.rows.length;
+        const last = first + page.rows.length - 1;
+        this.querySelector('.pager-info').textContent = page.rows.length === 0 ? '' :
+            `Rows ${first}-${last}${this.total != null ? ` of ${this.total}` : ''}`;
+        this.querySelector('.pager-previous').disabled = this.cursorStack.length === 0;
+        this.querySelector('.pager-next').disabled = !this.nextCursor;
+        console.log(`📄 Loaded ${page.rows.length} rows for ${this.tableId}`);
+    }
+
     applyFilters(filters){
         console.log(`🔍 applyFilters called with filters:`, filters);
 
+        if (this.serverPath) {
+            // Push the filters down to the server and start again from the first page
+            this.serverFilters = {
+                player: filters.players || [],
+                season: filters.seasons || []
+            };
+            this.reloadFromFirstPage();
+            return;
+        }
+
         // Get all filter types
         const filterTypes = Object.keys(filters);
         
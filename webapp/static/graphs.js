@@ -94,10 +94,94 @@ document.addEventListener('DOMContentLoaded', function() {
         const statArr = appliedFilters.stat || appliedFilters.statistic || appliedFilters['stat'] || [];
         const statValue = (statArr && statArr.length > 0) ? statArr[0] : 'attack_stars';
         console.log('📊 Building query params with stat:', statValue, 'from filters:', appliedFilters);
+        // Ask for every stat at once (selected first) so switching stats needs no new request
         params.append('stat', statValue);
+        allStatValues().filter(value => value !== statValue).forEach(value => params.append('stat', value));
         return params;
     }
 
+    // All stats offered by the Y axis dropdown
+    function allStatValues() {
+        return Array.from(document.querySelectorAll('.stat-checkbox')).map(input => input.value);
+    }
+
+    // Charts from the last batched request, reused while only the stat changes
+    let chartCache = { playersKey: null, charts: null };
+
+    // Draw the chart for the applied filters, from the cache if the players haven't changed
+    function showFilters(appliedFilters) {
+        const players = appliedFilters.players || appliedFilters.player || [];
+        const statArr = appliedFilters.stat || appliedFilters.statistic || [];
+        const statValue = (statArr && statArr.length > 0) ? statArr[0] : 'attack_stars';
+        const playersKey = JSON.stringify([...players].sort());
+
+        const cachedCharts = chartCache.playersKey === playersKey && chartCache.charts ? chartCache.charts.season : null;
+        if (cachedCharts && cachedCharts[statValue]) {
+            console.log('⚡ Switching chart locally to', statValue);
+            renderChart(cachedCharts[statValue]);
+            return Promise.resolve(cachedCharts[statValue]);
+        }
+
+        return fetchAndRender(buildQueryParamsFromFilters(appliedFilters)).then(chartData => {
+            chartCache = { playersKey, charts: chartData.charts || null };
+            return chartData;
+        });
+    }
+
+    // Draw the chart from a Chart.js data structure (labels, datasets, yLabel)
+    function renderChart(chartData) {
+        if (!chartData || !chartData.labels) {
+            throw new Error('Malformed chart data');
+        }
+        // Clean up old chart
+        if (lineChart) lineChart.destroy();
+
+        // Build Chart.js configuration (v3+ syntax)
+        const config = {
+            type: 'line',
+            data: {
+                labels: chartData.labels,
+                datasets: chartData.datasets
+            },
+            options: {
+                responsive: true,
+                maintainAspectRatio: true,
+                aspectRatio: 2,
+                scales: {
+                    x: {
+                        title: {
+                            display: true,
+                            text: chartData.xLabel || 'Season'
+                        }
+                    },
+                    y: {
+                        title: {
+                            display: true,
+                            text: window.yLabel || chartData.yLabel || 'Value'
+                        },
+                        beginAtZero: true
+                    }
+                },
+                plugins: {
+                    legend: {
+                        display: true,
+                        position: 'top',
+                        labels: { usePointStyle: true, padding: 12 }
+                    },
+                    title: { display: false }
+                },
+                layout: { padding: { left: 10, right: 10, top: 10, bottom: 10 } }
+            }
+        };
+
+        const canvas = document.getElementById(canvasId);
+        if (!canvas) {
+            throw new Error(`Canvas element with id "${canvasId}" not found`);
+        }
+        const ctx = canvas.getContext('2d');
+        lineChart = new Chart(ctx, config);
+    }
+
     // Fetch data from API and render chart
     function fetchAndRender(params) {
         const url = `/api/graph-data?${params.toString()}`;
@@ -114,59 +198,8 @@ document.addEventListener('DOMContentLoaded', function() {
                 return response.json();
             })
             .then(chartData => {
-                if (!chartData || !chartData.labels) {
-                    throw new Error('Malformed chart data from API');
-                }
                 console.log('✅ Chart data received:', chartData);
-
-                // Clean up old chart
-                if (lineChart) lineChart.destroy();
-
-                // Build Chart.js configuration (v3+ syntax)
-                const config = {
-                    type: 'line',
-                    data: {
-                        labels: chartData.labels,
-                        datasets: chartData.datasets
-                    },
-                    options: {
-                        responsive: true,
-                        maintainAspectRatio: true,
-                        aspectRatio: 2,
-                        scales: {
-                            x: {
-                                title: {
-                                    display: true,
-                                    text: 'Season'
-                                }
-                            },
-                            y: {
-                                title: {
-                                    display: true,
-                                    text: window.yLabel || chartData.yLabel || 'Value'
-                                },
-                                beginAtZero: true
-                            }
-                        },
-                        plugins: {
-                            legend: {
-                                display: true,
-                                position: 'top',
-                                labels: { usePointStyle: true, padding: 12 }
-                            },
-                            title: { display: false }
-                        },
-                        layout: { padding: { left: 10, right: 10, top: 10, bottom: 10 } }
-                    }
-                };
-
-                const canvas = document.getElementById(canvasId);
-                if (!canvas) {
-                    throw new Error(`Canvas element with id "${canvasId}" not found`);
-                }
-                const ctx = canvas.getContext('2d');
-                lineChart = new Chart(ctx, config);
-
+                renderChart(chartData);
                 return chartData;
             })
             .catch(err => {
@@ -180,9 +213,17 @@ document.addEventListener('DOMContentLoaded', function() {
             });
     }
 
-    // Initialize: ask API for initial data using default stat attack_stars.
+    // Initialize: draw the chart embedded in the page, or ask the API for the default stat attack_stars.
     (function init() {
-        // Use default stat 'attack_stars' for initial load
+        const initialData = document.getElementById('initial-chart-data');
+        if (initialData) {
+            try {
+                renderChart(JSON.parse(initialData.textContent));
+                return;
+            } catch (err) {
+                console.error('❌ Error rendering embedded chart data, fetching instead:', err);
+            }
+        }
         const params = new URLSearchParams();
         params.append('stat', 'attack_stars');
         fetchAndRender(params).catch(() => {}); // errors already logged
@@ -201,16 +242,14 @@ document.addEventListener('DOMContentLoaded', function() {
         // When Apply is clicked, FilterManager will call its apply callbacks with the appliedFilters
         window.filterManager.onApply((appliedFilters) => {
             console.log('🎯 Graphs received applied filters:', appliedFilters || {});
-            const params = buildQueryParamsFromFilters(appliedFilters || {});
-            fetchAndRender(params).catch(() => {});
+            showFilters(appliedFilters || {}).catch(() => {});
         });
 
         // Also respond to existing applied filters on load (if any)
         const current = window.filterManager.getAppliedFilters();
         if (current && Object.keys(current).length > 0) {
             console.log('📥 Applying existing filters on load:', current);
-            const params = buildQueryParamsFromFilters(current);
-            fetchAndRender(params).catch(() => {});
+            showFilters(current).catch(() => {});
         }
     }
 
@@ -11,6 +11,8 @@ SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 
 supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
 
+WAR_DATA_ORDER = ["wartag", "tag"]  # Unique key of war_data (sql/001_upsert_keys.sql), a stable order for paging
+
 def store_battle_tag(battleday, wartag, season):
     data = {
         "battleday": battleday,